@@ -0,0 +1,240 @@
+"""Load-test the inference service and report latency percentiles as JSON.
+
+Trains a fresh model with ``docker/training/train.py`` into a temporary
+directory, starts ``docker/inference/server.py`` in each requested mode, drives
+``/predict`` (or ``/predict/batch``) with a thread pool and prints one JSON
+result per mode. Run from anywhere, e.g.::
+
+    python bench/benchmark.py --mode dev prefork --concurrency 16 --duration 10
+    python bench/benchmark.py --mode prefork --rate 500 --batch-size 8 \\
+        --env MICROBATCH_MAX_SIZE=32 --output results.json
+
+``--rate 0`` (the default) is a closed loop: every client thread sends its next
+request as soon as the previous one returns. A positive ``--rate`` is an open
+loop with Poisson arrivals at that many requests per second; latency is then
+measured from each request's scheduled start, so a slow server cannot hide its
+queueing delay by slowing the client down.
+"""
+from pathlib import Path
+import argparse
+import http.client
+import json
+import os
+import random
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+LAB_DIR = Path(__file__).resolve().parents[1]
+TRAIN_SCRIPT = LAB_DIR / "docker" / "training" / "train.py"
+INFERENCE_DIR = LAB_DIR / "docker" / "inference"
+N_FEATURES = 4
+
+# How each server mode is launched from the inference directory
+SERVER_COMMANDS = {
+    "dev": [sys.executable, "server.py"],
+    "prefork": [sys.executable, "-m", "gunicorn", "--config", "gunicorn.conf.py", "server:app"],
+    "async": [sys.executable, "-m", "gunicorn", "--config", "gunicorn.conf.py", "server:app"],
+}
+
+
+def train_model(model_dir: Path):
+    env = {**os.environ, "MODEL_DIR": str(model_dir)}
+    subprocess.run([sys.executable, str(TRAIN_SCRIPT)], env=env, check=True,
+                   stdout=subprocess.DEVNULL)
+
+
+def start_server(mode: str, port: int, model_dir: Path, extra_env: dict,
+                 command=None, cwd=INFERENCE_DIR) -> subprocess.Popen:
+    env = {
+        **os.environ,
+        "MODEL_DIR": str(model_dir),
+        "PORT": str(port),
+        "INFERENCE_BIND": f"127.0.0.1:{port}",
+        "INFERENCE_MODE": "async" if mode == "async" else "prefork",
+        "INFERENCE_LOG_LEVEL": "warning",
+        **extra_env,
+    }
+    # A new session lets us stop the dev server's reloader child or gunicorn's
+    # workers together with the parent.
+    return subprocess.Popen(
+        command or SERVER_COMMANDS[mode], cwd=cwd, env=env, start_new_session=True,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+
+
+def stop_server(process: subprocess.Popen):
+    try:
+        os.killpg(process.pid, signal.SIGTERM)
+        process.wait(timeout=10)
+    except (ProcessLookupError, subprocess.TimeoutExpired):
+        os.killpg(process.pid, signal.SIGKILL)
+
+
+def wait_until_ready(port: int, timeout: float = 60.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            connection = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            connection.request("GET", "/readyz")
+            if connection.getresponse().status == 200:
+                return
+        except OSError:
+            pass
+        time.sleep(0.1)
+    raise TimeoutError(f"Server on port {port} was not ready after {timeout} seconds.")
+
+
+def make_payload(batch_size: int, wire: str, rng: np.random.Generator):
+    """Return (path, body, content type) for one request of ``batch_size`` rows."""
+    rows = rng.uniform([4.3, 2.0, 1.0, 0.1], [7.9, 4.4, 6.9, 2.5], size=(batch_size, N_FEATURES))
+    path = "/predict" if batch_size == 1 else "/predict/batch"
+    if wire == "ndarray":
+        return path, rows.astype("<f8").tobytes(), "application/x-ndarray; dtype=float64"
+    if batch_size == 1:
+        body = {"input": rows[0].round(2).tolist()}
+    else:
+        body = {"inputs": rows.round(2).tolist()}
+    return path, json.dumps(body).encode(), "application/json"
+
+
+def run_load(port, concurrency, duration, rate, batch_size, wire, seed=0):
+    """Drive the server and return per-request latencies (seconds) and error count."""
+    payloads = [make_payload(batch_size, wire, np.random.default_rng(seed + i)) for i in range(256)]
+    latencies, errors = [], [0]
+    lock = threading.Lock()
+    start = time.perf_counter()
+    stop_at = start + duration
+    arrivals = random.Random(seed)
+    next_arrival = [start]
+
+    def scheduled_start():
+        """Closed loop: now. Open loop: the next Poisson arrival, or None when done."""
+        if rate <= 0:
+            now = time.perf_counter()
+            return now if now < stop_at else None
+        with lock:
+            next_arrival[0] += arrivals.expovariate(rate)
+            scheduled = next_arrival[0]
+        return scheduled if scheduled < stop_at else None
+
+    def client(worker_id):
+        connection = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+        local, failed, i = [], 0, worker_id
+        while True:
+            scheduled = scheduled_start()
+            if scheduled is None:
+                break
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            path, body, content_type = payloads[i % len(payloads)]
+            i += concurrency
+            try:
+                connection.request("POST", path, body, {"Content-Type": content_type})
+                response = connection.getresponse()
+                response.read()
+                if response.status != 200:
+                    failed += 1
+            except (OSError, http.client.HTTPException):
+                failed += 1
+                connection.close()
+                connection = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+            local.append(time.perf_counter() - scheduled)
+        with lock:
+            latencies.extend(local)
+            errors[0] += failed
+
+    threads = [threading.Thread(target=client, args=(n,)) for n in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return np.array(latencies), errors[0], time.perf_counter() - start
+
+
+def summarize(latencies: np.ndarray, errors: int, elapsed: float, batch_size: int) -> dict:
+    ms = latencies * 1000
+    return {
+        "requests": int(len(latencies)),
+        "errors": errors,
+        "elapsed_s": round(elapsed, 3),
+        "requests_per_s": round(len(latencies) / elapsed, 1),
+        "rows_per_s": round(len(latencies) * batch_size / elapsed, 1),
+        "latency_ms": {
+            "mean": round(float(ms.mean()), 3) if len(ms) else None,
+            "p50": round(float(np.percentile(ms, 50)), 3) if len(ms) else None,
+            "p95": round(float(np.percentile(ms, 95)), 3) if len(ms) else None,
+            "p99": round(float(np.percentile(ms, 99)), 3) if len(ms) else None,
+            "max": round(float(ms.max()), 3) if len(ms) else None,
+        },
+    }
+
+
+def parse_env(pairs):
+    env = {}
+    for pair in pairs:
+        key, sep, value = pair.partition("=")
+        if not sep:
+            raise argparse.ArgumentTypeError(f"Expected KEY=VALUE, got {pair!r}.")
+        env[key] = value
+    return env
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mode", nargs="+", choices=sorted(SERVER_COMMANDS), default=["dev"])
+    parser.add_argument("--concurrency", type=int, default=8, help="client threads")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per mode")
+    parser.add_argument("--warmup", type=float, default=1.0, help="seconds before measuring")
+    parser.add_argument("--rate", type=float, default=0.0,
+                        help="open-loop requests/s (Poisson); 0 for a closed loop")
+    parser.add_argument("--batch-size", type=int, default=1, help="rows per request")
+    parser.add_argument("--wire", choices=["json", "ndarray"], default="json")
+    parser.add_argument("--port", type=int, default=18080)
+    parser.add_argument("--env", nargs="*", default=[], metavar="KEY=VALUE",
+                        help="extra environment for the server, e.g. MICROBATCH_MAX_SIZE=32")
+    parser.add_argument("--output", type=Path, help="also write the JSON results here")
+    args = parser.parse_args(argv)
+    extra_env = parse_env(args.env)
+
+    results = []
+    with tempfile.TemporaryDirectory(prefix="iris-bench-") as tmp:
+        model_dir = Path(tmp)
+        train_model(model_dir)
+        for mode in args.mode:
+            server = start_server(mode, args.port, model_dir, extra_env)
+            try:
+                wait_until_ready(args.port)
+                if args.warmup > 0:
+                    run_load(args.port, args.concurrency, args.warmup, args.rate,
+                             args.batch_size, args.wire)
+                latencies, errors, elapsed = run_load(
+                    args.port, args.concurrency, args.duration, args.rate,
+                    args.batch_size, args.wire,
+                )
+            finally:
+                stop_server(server)
+            results.append({
+                "mode": mode,
+                "concurrency": args.concurrency,
+                "rate": args.rate or None,
+                "batch_size": args.batch_size,
+                "wire": args.wire,
+                "server_env": extra_env,
+                **summarize(latencies, errors, elapsed, args.batch_size),
+            })
+
+    report = json.dumps(results, indent=2)
+    print(report)
+    if args.output:
+        args.output.write_text(report + "\n")
+
+
+if __name__ == "__main__":
+    main()
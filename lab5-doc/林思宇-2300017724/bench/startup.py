@@ -0,0 +1,126 @@
+"""Measure the inference server's time to first prediction as JSON.
+
+Each run starts a single gunicorn worker with ``server:app`` and polls
+``/predict`` until it answers 200; the time from spawning the process to that
+answer covers interpreter start-up, imports, loading the model and the first
+``predict`` call. Every ``--format`` is measured against the working tree, and
+``--baseline REV`` repeats them for the server at an older git revision (which
+must support the requested formats), e.g. to compare against the code before
+the slim serving mode::
+
+    python bench/startup.py --format pickle compact --baseline HEAD~1 --repeat 5
+"""
+from pathlib import Path
+import argparse
+import http.client
+import json
+import statistics
+import subprocess
+import sys
+import tarfile
+import tempfile
+import time
+
+from benchmark import INFERENCE_DIR, parse_env, start_server, stop_server, train_model
+
+BODY = json.dumps({"input": [5.1, 3.5, 1.4, 0.2]}).encode()
+
+
+def server_command(port: int) -> list:
+    # No config file: older revisions may not have gunicorn.conf.py
+    return [sys.executable, "-m", "gunicorn", "--workers", "1",
+            "--bind", f"127.0.0.1:{port}", "server:app"]
+
+
+def export_revision(rev: str, target: Path) -> Path:
+    """Extract docker/inference at ``rev`` into ``target`` and return its path."""
+    toplevel = subprocess.run(
+        ["git", "rev-parse", "--show-toplevel"],
+        cwd=INFERENCE_DIR, check=True, stdout=subprocess.PIPE, text=True,
+    ).stdout.strip()
+    tree = f"{rev}:{INFERENCE_DIR.relative_to(toplevel).as_posix()}"
+    archive = subprocess.run(
+        ["git", "archive", "--format=tar", tree],
+        cwd=toplevel, check=True, stdout=subprocess.PIPE,
+    ).stdout
+    with tempfile.TemporaryFile() as buffer:
+        buffer.write(archive)
+        buffer.seek(0)
+        with tarfile.open(fileobj=buffer) as tar:
+            tar.extractall(target)
+    return target
+
+
+def first_prediction(port: int, timeout: float = 60.0) -> float:
+    """Poll ``/predict`` until it succeeds; return the time it took."""
+    start = time.perf_counter()
+    while time.perf_counter() - start < timeout:
+        try:
+            connection = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            connection.request("POST", "/predict", BODY, {"Content-Type": "application/json"})
+            if connection.getresponse().status == 200:
+                return time.perf_counter() - start
+        except (OSError, http.client.HTTPException):
+            pass
+        time.sleep(0.01)
+    raise TimeoutError(f"No prediction from port {port} within {timeout} seconds.")
+
+
+def measure(label, source_dir, model_format, port, model_dir, extra_env, repeat) -> dict:
+    env = {**extra_env, "MODEL_FORMAT": model_format}
+    timings = []
+    for _ in range(repeat):
+        server = start_server("prefork", port, model_dir, env,
+                              command=server_command(port), cwd=source_dir)
+        try:
+            timings.append(first_prediction(port))
+        finally:
+            stop_server(server)
+    ms = [t * 1000 for t in timings]
+    return {
+        "variant": label,
+        "model_format": model_format,
+        "repeat": repeat,
+        "time_to_first_prediction_ms": {
+            "median": round(statistics.median(ms), 1),
+            "min": round(min(ms), 1),
+            "max": round(max(ms), 1),
+        },
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--format", nargs="+", choices=["pickle", "compact"],
+                        default=["pickle", "compact"])
+    parser.add_argument("--baseline", metavar="REV",
+                        help="also measure the server at this git revision")
+    parser.add_argument("--repeat", type=int, default=5, help="cold starts per variant")
+    parser.add_argument("--port", type=int, default=18081)
+    parser.add_argument("--env", nargs="*", default=[], metavar="KEY=VALUE",
+                        help="extra environment for the server")
+    parser.add_argument("--output", type=Path, help="also write the JSON results here")
+    args = parser.parse_args(argv)
+    extra_env = parse_env(args.env)
+
+    results = []
+    with tempfile.TemporaryDirectory(prefix="iris-startup-") as tmp:
+        model_dir = Path(tmp) / "models"
+        train_model(model_dir)
+        if args.baseline:
+            source = export_revision(args.baseline, Path(tmp) / "baseline")
+            for model_format in args.format:
+                results.append(measure(f"baseline ({args.baseline})", source, model_format,
+                                       args.port, model_dir, extra_env, args.repeat))
+        for model_format in args.format:
+            results.append(measure("working tree", INFERENCE_DIR, model_format,
+                                   args.port, model_dir, extra_env, args.repeat))
+
+    report = json.dumps(results, indent=2)
+    print(report)
+    if args.output:
+        args.output.write_text(report + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Admission control for the prediction endpoints: shed load before it queues."""
+from collections import OrderedDict
+import threading
+import time
+
+
+class AdmissionController:
+    """Bounded in-flight limit plus a per-client token bucket.
+
+    :meth:`admit` answers immediately: ``None`` admits the request (pair it
+    with :meth:`release`), otherwise ``(status, retry_after_seconds)`` says to
+    reject it with 503 (server saturated) or 429 (client over its rate).
+    ``max_in_flight``, ``max_queue`` or ``rate`` set to 0 disables that
+    check. Buckets are kept for at most ``max_clients`` clients, least
+    recently seen dropped first.
+
+    All counts are per process. ``in_flight`` only sees requests that already
+    run on a worker thread, so with gthread it can never exceed the thread
+    count; requests accepted but still waiting for a thread are reported by
+    ``queue_probe`` (set by gunicorn.conf.py to the thread pool's work queue
+    size) and rejected once ``max_queue`` of them are waiting.
+    """
+
+    def __init__(self, max_in_flight=0, rate=0.0, burst=None, max_clients=10_000,
+                 max_queue=0):
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.queue_probe = None  # callable returning the dispatch queue depth
+        self.rate = rate
+        self.burst = burst if burst else max(1.0, rate)
+        self.max_clients = max_clients
+        self.in_flight = 0
+        self.admitted = 0
+        self.rejected_overload = 0
+        self.rejected_queue_full = 0
+        self.rejected_rate_limited = 0
+        self._buckets = OrderedDict()  # client -> [tokens, last refill time]
+        self._lock = threading.Lock()
+
+    def _take_token(self, client, now) -> float:
+        """Spend one of ``client``'s tokens; return 0, or the seconds until one is available."""
+        bucket = self._buckets.get(client)
+        if bucket is None:
+            bucket = self._buckets[client] = [self.burst, now]
+            if len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(client)
+        tokens = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+        bucket[1] = now
+        if tokens >= 1:
+            bucket[0] = tokens - 1
+            return 0.0
+        bucket[0] = tokens
+        return (1 - tokens) / self.rate
+
+    def queue_depth(self) -> int:
+        """Requests accepted by this worker that are still waiting for a thread."""
+        return self.queue_probe() if self.queue_probe is not None else 0
+
+    def admit(self, client):
+        depth = self.queue_depth()
+        with self._lock:
+            # Capacity first: a request shed with 503 must not cost the client a token
+            if self.max_queue and depth >= self.max_queue:
+                self.rejected_queue_full += 1
+                return 503, 1.0
+            if self.max_in_flight and self.in_flight >= self.max_in_flight:
+                self.rejected_overload += 1
+                return 503, 1.0
+            if self.rate > 0:
+                wait = self._take_token(client, time.monotonic())
+                if wait > 0:
+                    self.rejected_rate_limited += 1
+                    return 429, wait
+            self.in_flight += 1
+            self.admitted += 1
+            return None
+
+    def release(self):
+        with self._lock:
+            self.in_flight -= 1
+
+    def stats(self) -> dict:
+        depth = self.queue_depth()
+        with self._lock:
+            return {
+                "in_flight": self.in_flight,
+                "max_in_flight": self.max_in_flight,
+                "queue_depth": depth,
+                "max_queue": self.max_queue,
+                "rate_per_client": self.rate,
+                "burst": self.burst,
+                "clients_tracked": len(self._buckets),
+                "admitted": self.admitted,
+                "rejected_overload": self.rejected_overload,
+                "rejected_queue_full": self.rejected_queue_full,
+                "rejected_rate_limited": self.rejected_rate_limited,
+            }
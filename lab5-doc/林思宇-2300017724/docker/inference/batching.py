@@ -0,0 +1,79 @@
+"""Coalesce concurrent single-row predictions into one model call."""
+from concurrent.futures import Future
+import queue
+import threading
+import time
+
+import numpy as np
+
+
+class MicroBatcher:
+    """Gather feature vectors from concurrent requests and predict them together.
+
+    A background thread takes the first waiting vector, keeps collecting until
+    ``max_batch_size`` vectors are queued or ``max_wait_us`` microseconds have
+    passed, then runs ``predict_fn`` once on the stacked matrix and hands each
+    row's result back to the request that submitted it.
+    """
+
+    def __init__(self, predict_fn, max_batch_size=32, max_wait_us=500):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1.")
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_us / 1_000_000
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def submit(self, vector) -> Future:
+        """Queue one feature vector; the returned future resolves to its prediction."""
+        self._ensure_worker()
+        future = Future()
+        self._queue.put((vector, future))
+        return future
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+    def predict(self, vector, timeout=None):
+        """Blocking helper around :meth:`submit`."""
+        return self.submit(vector).result(timeout)
+
+    def _ensure_worker(self):
+        # Started lazily so every worker process gets its own thread after fork.
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="micro-batcher", daemon=True
+                )
+                self._thread.start()
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            futures = [future for _, future in batch]
+            try:
+                results = self.predict_fn(np.vstack([vector for vector, _ in batch]))
+            except Exception as exc:  # surface the failure to every waiting request
+                for future in futures:
+                    future.set_exception(exc)
+                continue
+            for future, result in zip(futures, results):
+                future.set_result(result)
@@ -0,0 +1,131 @@
+"""Evaluate an exported SVC with plain NumPy, without importing scikit-learn.
+
+``train.py`` writes the fitted model's support vectors, dual coefficients,
+intercepts and kernel parameters to an ``.npz`` file; :class:`CompactSVC`
+reproduces libsvm's one-vs-one voting on top of them.
+"""
+from pathlib import Path
+import struct
+import zipfile
+
+import numpy as np
+
+_LOCAL_HEADER_SIZE = 30  # fixed part of a ZIP local file header
+
+
+def _read_member(handle, start: int, path: Path, mmap_mode):
+    """Read the .npy array stored at ``start``; memory-map it when possible."""
+    handle.seek(start)
+    version = np.lib.format.read_magic(handle)
+    if version == (1, 0):
+        shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(handle)
+    else:
+        shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(handle)
+    if dtype.hasobject:
+        raise ValueError("Compact models must not contain object arrays.")
+    count = int(np.prod(shape))
+    if not shape or count == 0:  # scalars and empty arrays are read as is
+        return np.fromfile(handle, dtype=dtype, count=count).reshape(shape)
+    return np.memmap(path, dtype=dtype, mode=mmap_mode, offset=handle.tell(), shape=shape,
+                     order="F" if fortran_order else "C")
+
+
+def load_arrays(path: Path, mmap_mode=None) -> dict:
+    """Return the arrays of an ``.npz`` file by name.
+
+    ``np.load`` always reads ``.npz`` members into private memory. Since
+    ``np.savez`` stores them uncompressed, each member's array data is a
+    contiguous byte range of the file, so with ``mmap_mode`` it is mapped in
+    place instead, and every process serving the file shares one copy
+    through the page cache.
+    """
+    if mmap_mode is None:
+        with np.load(path, allow_pickle=False) as arrays:
+            return {name: arrays[name] for name in arrays.files}
+
+    arrays = {}
+    with open(path, "rb") as handle, zipfile.ZipFile(handle) as archive:
+        for info in archive.infolist():
+            name = info.filename[:-len(".npy")]
+            if info.compress_type != zipfile.ZIP_STORED:
+                with archive.open(info) as member:
+                    arrays[name] = np.lib.format.read_array(member, allow_pickle=False)
+                continue
+            handle.seek(info.header_offset)
+            header = handle.read(_LOCAL_HEADER_SIZE)
+            name_length, extra_length = struct.unpack("<HH", header[26:30])
+            start = info.header_offset + _LOCAL_HEADER_SIZE + name_length + extra_length
+            arrays[name] = _read_member(handle, start, path, mmap_mode)
+    return arrays
+
+
+class CompactSVC:
+    """Vectorized ``predict`` for a multi-class SVC with an RBF or linear kernel."""
+
+    def __init__(self, support_vectors, dual_coef, intercept, n_support, classes,
+                 kernel="rbf", gamma=1.0, target_names=None):
+        if kernel not in ("rbf", "linear"):
+            raise ValueError(f"Unsupported kernel {kernel!r}.")
+        # asarray does not copy float64 input, so memory-mapped arrays stay shared
+        self.support_vectors = np.asarray(support_vectors, dtype=float)
+        self.dual_coef = np.asarray(dual_coef, dtype=float)
+        self.intercept = np.asarray(intercept, dtype=float)
+        self.classes = np.asarray(classes)
+        self.kernel = kernel
+        self.gamma = float(gamma)
+        self.n_features_in_ = self.support_vectors.shape[1]
+        # Human-readable label per class index, if the export carries them
+        self.target_names = None if target_names is None else np.asarray(target_names)
+        self._sv_sq_norms = np.einsum("ij,ij->i", self.support_vectors, self.support_vectors)
+
+        # Support vectors are stored grouped by class; remember each group's slice
+        # and the (i, j) class pair behind every one-vs-one decision function.
+        bounds = np.concatenate([[0], np.cumsum(n_support)])
+        self._groups = [slice(bounds[k], bounds[k + 1]) for k in range(len(n_support))]
+        self._pairs = [
+            (i, j) for i in range(len(self.classes)) for j in range(i + 1, len(self.classes))
+        ]
+
+    @classmethod
+    def load(cls, path: Path, mmap_mode=None) -> "CompactSVC":
+        """Load an export; with ``mmap_mode`` its arrays stay memory-mapped."""
+        arrays = load_arrays(path, mmap_mode)
+        return cls(
+            arrays["support_vectors"],
+            arrays["dual_coef"],
+            arrays["intercept"],
+            arrays["n_support"],
+            arrays["classes"],
+            kernel=str(arrays["kernel"]),
+            gamma=float(arrays["gamma"]),
+            target_names=arrays.get("target_names"),
+        )
+
+    def _kernel(self, X: np.ndarray) -> np.ndarray:
+        cross = X @ self.support_vectors.T
+        if self.kernel == "linear":
+            return cross
+        sq_dists = np.einsum("ij,ij->i", X, X)[:, None] - 2 * cross + self._sv_sq_norms
+        return np.exp(-self.gamma * np.maximum(sq_dists, 0))
+
+    def decision_function(self, X) -> np.ndarray:
+        """One-vs-one decision values, one column per class pair."""
+        K = self._kernel(np.asarray(X, dtype=float))
+        columns = []
+        for p, (i, j) in enumerate(self._pairs):
+            gi, gj = self._groups[i], self._groups[j]
+            columns.append(
+                K[:, gi] @ self.dual_coef[j - 1, gi]
+                + K[:, gj] @ self.dual_coef[i, gj]
+                + self.intercept[p]
+            )
+        return np.column_stack(columns)
+
+    def predict(self, X) -> np.ndarray:
+        decisions = self.decision_function(X)
+        votes = np.zeros((decisions.shape[0], len(self.classes)), dtype=int)
+        rows = np.arange(decisions.shape[0])
+        for p, (i, j) in enumerate(self._pairs):
+            winners = np.where(decisions[:, p] > 0, i, j)
+            np.add.at(votes, (rows, winners), 1)
+        return self.classes[np.argmax(votes, axis=1)]
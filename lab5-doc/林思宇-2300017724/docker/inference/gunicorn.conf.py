@@ -0,0 +1,84 @@
+"""Gunicorn settings for the production inference server.
+
+Run with ``gunicorn --config gunicorn.conf.py server:app``. ``INFERENCE_MODE``
+selects ``prefork`` (pre-forked workers, each with a thread pool) or ``async``
+(gevent workers for many slow or idle connections per process).
+"""
+import os
+import shutil
+
+INFERENCE_MODE = os.environ.get("INFERENCE_MODE", "prefork")
+
+bind = os.environ.get("INFERENCE_BIND", "0.0.0.0:8080")
+workers = int(os.environ.get("INFERENCE_WORKERS", os.cpu_count() or 1))
+threads = int(os.environ.get("INFERENCE_THREADS", "4"))
+# Kernel listen queue shared by all workers; connections beyond it are refused.
+backlog = int(os.environ.get("INFERENCE_BACKLOG", "2048"))
+# Requests a gthread worker may accept beyond its busy threads. Past that it
+# stops accepting, so callers wait in the bounded backlog instead of an
+# unbounded in-process queue, and server.py answers 503 once this many
+# accepted requests are waiting. Idle keep-alive connections share the limit.
+ADMISSION_MAX_QUEUE = int(os.environ.get("ADMISSION_MAX_QUEUE", "0"))
+ADMISSION_MAX_IN_FLIGHT = int(os.environ.get("ADMISSION_MAX_IN_FLIGHT", "0"))
+
+if INFERENCE_MODE == "async":
+    worker_class = "gevent"
+    worker_connections = int(os.environ.get("INFERENCE_WORKER_CONNECTIONS", "1000"))
+elif INFERENCE_MODE == "prefork":
+    worker_class = "gthread" if threads > 1 else "sync"
+    if ADMISSION_MAX_QUEUE:
+        worker_connections = threads + ADMISSION_MAX_QUEUE
+else:
+    raise ValueError(f"Unknown INFERENCE_MODE {INFERENCE_MODE!r}; use 'prefork' or 'async'.")
+
+# Import server.py inside each worker, so the joblib model is loaded once per
+# worker after fork and no model state or batching threads cross the fork.
+preload_app = False
+
+timeout = int(os.environ.get("INFERENCE_TIMEOUT", "30"))
+graceful_timeout = 30
+keepalive = 5
+
+accesslog = "-"
+errorlog = "-"
+loglevel = os.environ.get("INFERENCE_LOG_LEVEL", "info")
+
+
+def on_starting(server):
+    # Metric files from a previous run would be summed into this one's, so the
+    # multiprocess directory starts out empty on every start.
+    multiproc_dir = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if multiproc_dir:
+        shutil.rmtree(multiproc_dir, ignore_errors=True)
+        os.makedirs(multiproc_dir)
+
+
+def when_ready(server):
+    if INFERENCE_MODE == "prefork" and ADMISSION_MAX_IN_FLIGHT >= threads:
+        server.log.warning(
+            "ADMISSION_MAX_IN_FLIGHT=%s can never trigger with %s threads per worker; "
+            "use ADMISSION_MAX_QUEUE to bound waiting requests",
+            ADMISSION_MAX_IN_FLIGHT, threads,
+        )
+
+
+def post_fork(server, worker):
+    server.log.info("Worker %s forked (%s mode)", worker.pid, INFERENCE_MODE)
+
+
+def post_worker_init(worker):
+    # gthread workers queue accepted, readable connections in their thread
+    # pool; expose that queue to admission control as the dispatch backlog.
+    tpool = getattr(worker, "tpool", None)
+    if tpool is not None:
+        from server import admission
+
+        admission.queue_probe = tpool._work_queue.qsize
+
+
+def child_exit(server, worker):
+    # Drop the exited worker's live gauges from the shared Prometheus files.
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,53 @@
+"""Prometheus metrics for the inference server.
+
+``PREDICT_STAGE_SECONDS`` splits each prediction request into the stages that
+make up its latency, so a slow p99 can be traced to JSON parsing, array
+conversion, the model itself or rendering the response instead of guessing.
+
+Every gunicorn worker keeps its own counters. Set ``PROMETHEUS_MULTIPROC_DIR``
+to a writable directory (the Docker image does; gunicorn.conf.py empties it on
+start) to have ``/metrics`` aggregate all workers; without it each scrape only
+sees the worker that happened to answer.
+"""
+import os
+
+from flask import Response
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+# A single-row predict takes tens of microseconds per stage, far below the
+# default buckets' 5 ms floor, so the buckets start at 10 us.
+STAGE_BUCKETS = (
+    0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005,
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0,
+)
+
+PREDICT_STAGE_SECONDS = Histogram(
+    "predict_stage_seconds",
+    "Time spent in each stage of a prediction request",
+    ["endpoint", "stage"],
+    buckets=STAGE_BUCKETS,
+)
+
+
+def stage_timer(endpoint: str, stage: str):
+    """Context manager observing one stage of ``endpoint``.
+
+    Stages are ``parse`` (JSON or raw ndarray body), ``convert`` (list to ndarray), ``model``
+    (cache, batcher and ``model.predict``), ``lookup`` (class index to label)
+    and ``render`` (serializing the response).
+    """
+    return PREDICT_STAGE_SECONDS.labels(endpoint, stage).time()
+
+
+def metrics():
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return Response(generate_latest(registry), content_type=CONTENT_TYPE_LATEST)
+    return Response(generate_latest(), content_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,180 @@
+"""Serve every model artifact under the model directory, loading each on demand."""
+from collections import OrderedDict
+from pathlib import Path
+import logging
+import threading
+import time
+
+import numpy as np
+
+from model_store import ModelStore
+
+logger = logging.getLogger(__name__)
+
+
+def model_nbytes(obj, depth=0) -> int:
+    """Approximate a fitted model's size by summing the NumPy arrays it holds."""
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes
+    if depth > 3:
+        return 0
+    if isinstance(obj, (list, tuple)):
+        return sum(model_nbytes(item, depth + 1) for item in obj)
+    if isinstance(obj, dict):
+        return sum(model_nbytes(value, depth + 1) for value in obj.values())
+    if hasattr(obj, "__dict__"):
+        return model_nbytes(vars(obj), depth + 1)
+    return 0
+
+
+class ModelRegistry:
+    """Map artifact names to lazily loaded models under a memory budget.
+
+    Every ``<name>.pkl`` / ``<name>.npz`` directly inside ``model_dir`` is a
+    model called ``<name>`` (``preferred_suffix`` wins when both exist). A
+    model is loaded on its first request and reloaded when its file changes;
+    once the loaded models exceed ``max_bytes``, the least recently used ones
+    are unloaded, and a model whose file is deleted is dropped. ``pinned``
+    stores (e.g. the server's primary model) are shared rather than loaded
+    twice, and never evicted. The directory listing is reused for
+    ``discovery_ttl`` seconds, so requests for unknown names cannot keep the
+    disk busy.
+    """
+
+    def __init__(self, model_dir: Path, loaders: dict, preferred_suffix=".pkl",
+                 max_bytes=512 * 1024 * 1024, mmap_mode=None, pinned=None,
+                 discovery_ttl=2.0):
+        self.model_dir = Path(model_dir)
+        self.loaders = loaders  # file suffix -> loader(path, mmap_mode=...)
+        self.preferred_suffix = preferred_suffix
+        self.max_bytes = max_bytes
+        self.mmap_mode = mmap_mode
+        self.discovery_ttl = discovery_ttl
+        self.evictions = 0
+        self._pinned = dict(pinned or {})
+        self._stores = {}
+        self._loaded = OrderedDict()  # name -> estimated bytes, least recently used first
+        self._lock = threading.Lock()  # guards the dicts above; never held while loading
+        self._load_locks = {}  # name -> lock serializing loads of that model only
+        self._discovery = None  # (monotonic time, discover() result)
+
+    def discover(self) -> dict:
+        """Return ``{name: path}`` for the artifacts currently on disk."""
+        found = {}
+        for path in sorted(self.model_dir.iterdir()) if self.model_dir.is_dir() else []:
+            if not path.is_file() or path.suffix not in self.loaders:
+                continue
+            if path.stem not in found or path.suffix == self.preferred_suffix:
+                found[path.stem] = path
+        return found
+
+    def _discovered(self, refresh=False) -> dict:
+        """:meth:`discover`, reused for ``discovery_ttl`` seconds.
+
+        Never called with ``self._lock`` held: listing a large directory must
+        not hold up requests for models that are already known.
+        """
+        now = time.monotonic()
+        cached = self._discovery
+        if not refresh and cached is not None and now - cached[0] < self.discovery_ttl:
+            return cached[1]
+        found = self.discover()
+        self._discovery = (now, found)
+        return found
+
+    def _store(self, name):
+        """Return the store for ``name``, creating it if its file exists."""
+        with self._lock:
+            store = self._stores.get(name)
+        if store is not None:
+            if store.path.exists():
+                return store
+            self._drop(name, store)
+        # After a deletion, list again: another suffix may still be there
+        path = self._discovered(refresh=store is not None).get(name)
+        if path is None:
+            return None
+        with self._lock:
+            store = self._stores.get(name)
+            if store is None:
+                store = ModelStore(path, mmap_mode=self.mmap_mode, loader=self.loaders[path.suffix])
+                self._stores[name] = store
+            return store
+
+    def _drop(self, name, store):
+        """Forget a model whose file was deleted, so it is no longer served."""
+        with self._lock:
+            if self._stores.get(name) is store:
+                del self._stores[name]
+            self._loaded.pop(name, None)
+        store.unload()
+        logger.info("Dropped model %s: %s no longer exists", name, store.path)
+
+    def get(self, name):
+        """Return the :class:`LoadedModel` for ``name``, or ``None`` if there is none.
+
+        Discovery and loading happen outside the registry lock, so unknown
+        names and slow or large models only delay their own requests.
+        """
+        if name in self._pinned:
+            return self._pinned[name].current
+        store = self._store(name)
+        if store is None:
+            return None
+        with self._lock:
+            current = store.current
+            if current is not None and not store.is_stale():
+                self._touch(name)
+                return current
+            load_lock = self._load_locks.setdefault(name, threading.Lock())
+
+        with load_lock:
+            current = store.current
+            if current is None or store.is_stale():
+                current = store.load()
+                nbytes = model_nbytes(current.model)
+                with self._lock:
+                    self._loaded[name] = nbytes
+                    self._evict(keep=name)
+        with self._lock:
+            self._touch(name)
+        return current
+
+    def _touch(self, name):
+        if name in self._loaded:
+            self._loaded.move_to_end(name)
+
+    def _evict(self, keep):
+        while sum(self._loaded.values()) > self.max_bytes and len(self._loaded) > 1:
+            name = next(iter(self._loaded))
+            if name == keep:
+                self._loaded.move_to_end(name)
+                continue
+            del self._loaded[name]
+            store = self._stores.get(name)
+            if store is not None:
+                store.unload()
+            self.evictions += 1
+            logger.info("Evicted model %s to stay under %d bytes", name, self.max_bytes)
+
+    def describe(self) -> dict:
+        found = self._discovered()
+        with self._lock:
+            names = sorted(set(found) | set(self._pinned))
+            return {
+                "models": [
+                    {
+                        "name": name,
+                        "pinned": name in self._pinned,
+                        "loaded": (
+                            self._pinned[name].current is not None
+                            if name in self._pinned else name in self._loaded
+                        ),
+                        "bytes": self._loaded.get(name),
+                    }
+                    for name in names
+                ],
+                "loaded_bytes": sum(self._loaded.values()),
+                "max_bytes": self.max_bytes,
+                "evictions": self.evictions,
+            }
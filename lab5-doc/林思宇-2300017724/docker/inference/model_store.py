@@ -0,0 +1,156 @@
+"""Load the model artifact and hot-swap it when the shared volume changes."""
+from datetime import datetime, timezone
+from importlib import metadata
+from pathlib import Path
+from typing import NamedTuple, Optional
+import hashlib
+import json
+import logging
+import threading
+import time
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = "latest.json"
+
+
+def load_pickle(path: Path, mmap_mode: Optional[str] = None):
+    """Unpickle a joblib artifact; joblib and scikit-learn are imported on first use."""
+    import joblib
+
+    return joblib.load(path, mmap_mode=mmap_mode)
+
+
+class LoadedModel(NamedTuple):
+    """An immutable snapshot of the model currently being served."""
+
+    model: object
+    version: str
+    loaded_at: datetime
+    sha256: str
+    manifest: Optional[dict] = None
+    target_names: Optional[np.ndarray] = None
+
+
+class ModelStore:
+    """Hold the current model and replace it atomically on reload.
+
+    Request handlers read :attr:`current` once and keep using that snapshot, so
+    a reload that finishes mid-request never mixes two models.
+    """
+
+    def __init__(self, path: Path, mmap_mode: Optional[str] = None, loader=load_pickle):
+        self.path = Path(path)
+        self.mmap_mode = mmap_mode
+        self.loader = loader
+        self.reloads = 0
+        self._current: Optional[LoadedModel] = None
+        self._loaded_signature = None
+        self._failed_signature = None
+        self._lock = threading.Lock()
+        self._watcher = None
+
+    @property
+    def current(self) -> Optional[LoadedModel]:
+        return self._current
+
+    def _signature(self):
+        stat = self.path.stat()
+        return stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+    def is_stale(self) -> bool:
+        """True if the file on disk is not the one that was last loaded."""
+        try:
+            return self._signature() != self._loaded_signature
+        except FileNotFoundError:
+            return False
+
+    def unload(self):
+        """Drop the loaded model so its memory can be reclaimed."""
+        with self._lock:
+            self._current = None
+            self._loaded_signature = None
+
+    def _read_manifest(self, digest: str) -> Optional[dict]:
+        """Return train.py's ``latest.json`` if it describes the file we just hashed."""
+        try:
+            manifest = json.loads((self.path.parent / MANIFEST_NAME).read_text())
+        except (OSError, ValueError):
+            return None
+        if digest == manifest.get("compact_sha256"):
+            return manifest
+        if digest != manifest.get("sha256"):
+            return None
+
+        # Only the pickle depends on the scikit-learn version that unpickles it
+        runtime_version = metadata.version("scikit-learn")
+        if manifest.get("sklearn_version") != runtime_version:
+            logger.warning(
+                "Model %s was trained with scikit-learn %s but is served with %s",
+                manifest.get("version"), manifest.get("sklearn_version"), runtime_version,
+            )
+        return manifest
+
+    def load(self) -> LoadedModel:
+        """Load the artifact from disk and make it the served model.
+
+        An artifact whose checksum matches the served version is not unpickled
+        again.
+        """
+        signature = self._signature()
+        digest = hashlib.sha256(self.path.read_bytes()).hexdigest()
+        current = self._current
+        if current is not None and current.sha256 == digest:
+            self._loaded_signature = signature
+            return current
+
+        model = self.loader(self.path, mmap_mode=self.mmap_mode)
+        manifest = self._read_manifest(digest)
+        # Name the model after its training run when the manifest vouches for it
+        version = manifest["version"] if manifest else digest[:12]
+        # Class labels travel with the artifact (compact export) or its manifest
+        target_names = getattr(model, "target_names", None)
+        if target_names is None and manifest and manifest.get("target_names"):
+            target_names = np.asarray(manifest["target_names"])
+        loaded = LoadedModel(
+            model, version, datetime.now(timezone.utc), digest, manifest, target_names
+        )
+        with self._lock:
+            if self._current is not None:
+                self.reloads += 1
+            self._current = loaded
+            self._loaded_signature = signature
+        logger.info("Loaded model %s from %s", loaded.version, self.path)
+        return loaded
+
+    def watch(self, interval: float):
+        """Poll the artifact's inode/size/mtime and reload it in the background."""
+        if self._watcher is None:
+            self._watcher = threading.Thread(
+                target=self._watch, args=(interval,), name="model-watcher", daemon=True
+            )
+            self._watcher.start()
+
+    def _watch(self, interval: float):
+        pending = None
+        while True:
+            time.sleep(interval)
+            try:
+                signature = self._signature()
+            except FileNotFoundError:
+                continue
+            if signature in (self._loaded_signature, self._failed_signature):
+                pending = None
+                continue
+            if signature != pending:
+                # Still being written, or just replaced: wait one more poll so
+                # we only load a file whose size and mtime have settled.
+                pending = signature
+                continue
+            try:
+                self.load()
+            except Exception:
+                self._failed_signature = signature
+                logger.exception("Failed to reload %s; keeping the current model", self.path)
@@ -0,0 +1,90 @@
+"""In-process LRU cache of predictions keyed on the quantized input vector."""
+from collections import OrderedDict
+import sys
+import threading
+import time
+
+import numpy as np
+
+
+class PredictionCache:
+    """LRU + TTL cache of class indices, scoped to one model version.
+
+    Keys are feature vectors rounded to ``decimals`` places, so values that
+    differ only by float noise share an entry. Entries are evicted least
+    recently used first once ``max_entries`` or ``max_bytes`` (either may be 0
+    for no limit) is exceeded, and the whole cache is dropped as soon as it is
+    asked about a different model version.
+    """
+
+    def __init__(self, max_entries=10_000, max_bytes=0, ttl=300.0, decimals=4):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.decimals = decimals
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._entries = OrderedDict()  # key -> (value, expires_at, size)
+        self._bytes = 0
+        self._version = None
+        self._lock = threading.Lock()
+
+    def key(self, vector: np.ndarray) -> bytes:
+        # Adding 0.0 folds -0.0 into 0.0 so both hash the same.
+        return (np.round(np.asarray(vector, dtype=float), self.decimals) + 0.0).tobytes()
+
+    def _switch_version(self, version):
+        if version != self._version:
+            self._entries.clear()
+            self._bytes = 0
+            self._version = version
+
+    def get(self, version, key):
+        """Return the cached value for ``key`` under ``version``, or ``None``."""
+        with self._lock:
+            self._switch_version(version)
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, expires_at, size = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                self._bytes -= size
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, version, key, value):
+        with self._lock:
+            self._switch_version(version)
+            size = sys.getsizeof(key) + sys.getsizeof(value)
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[2]
+            self._entries[key] = (value, time.monotonic() + self.ttl, size)
+            self._bytes += size
+            while self._entries and (
+                (self.max_entries and len(self._entries) > self.max_entries)
+                or (self.max_bytes and self._bytes > self.max_bytes)
+            ):
+                _, (_, _, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "version": self._version,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
@@ -0,0 +1,72 @@
+"""On-demand sampling profiler for a running worker.
+
+``sample_stacks`` polls every other thread's current stack with
+``sys._current_frames()`` at a fixed interval, so it needs no tracing hooks,
+costs nothing while idle and can be started on a live server without a
+restart. The result is in the collapsed-stack format read by ``flamegraph.pl``
+and speedscope: one ``frame;frame;...;frame count`` line per distinct stack.
+
+It cannot profile gevent workers: every request greenlet shares the OS thread
+the sampler runs on, so ``sys._current_frames()`` only ever sees the sampler.
+Nor sync workers: their only request thread is the one busy sampling.
+"""
+from collections import Counter
+import os
+import sys
+import threading
+import time
+
+_running = threading.Lock()
+
+
+class ProfilerBusy(RuntimeError):
+    """Raised when a profile is requested while another one is running."""
+
+
+def unsupported_reason(environ):
+    """Why the worker serving ``environ`` cannot be sampled, or ``None`` if it can."""
+    monkey = sys.modules.get("gevent.monkey")
+    if monkey is not None and monkey.is_module_patched("threading"):
+        return "Thread sampling does not work with gevent workers (INFERENCE_MODE=async)."
+    if not environ.get("wsgi.multithread"):
+        return "Sync workers have no other request thread to sample (set INFERENCE_THREADS > 1)."
+    return None
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{os.path.basename(code.co_filename)}:{code.co_name}:{frame.f_lineno}"
+
+
+def _collapse(frame) -> str:
+    labels = []
+    while frame is not None:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    return ";".join(reversed(labels))
+
+
+def sample_stacks(duration: float, interval: float) -> Counter:
+    """Sample all other threads for ``duration`` seconds; return stack counts.
+
+    Only one profile runs per process at a time, so a burst of requests cannot
+    stack up samplers on a busy worker.
+    """
+    if not _running.acquire(blocking=False):
+        raise ProfilerBusy("A profile is already running in this worker.")
+    try:
+        own_thread = threading.get_ident()
+        counts = Counter()
+        deadline = time.monotonic() + duration
+        while time.monotonic() < deadline:
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id != own_thread:
+                    counts[_collapse(frame)] += 1
+            time.sleep(interval)
+        return counts
+    finally:
+        _running.release()
+
+
+def format_collapsed(counts: Counter) -> str:
+    return "".join(f"{stack} {count}\n" for stack, count in counts.most_common())
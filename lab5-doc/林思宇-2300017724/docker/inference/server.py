@@ -1,53 +1,646 @@
+from importlib.util import find_spec
 from pathlib import Path
+import functools
+import hmac
+import logging
+import math
+import os
+import threading
 import time
 
-from flask import Flask, request, jsonify
-from sklearn import datasets
+from flask import Flask, Response, g, request, jsonify
+from werkzeug.middleware.proxy_fix import ProxyFix
 import numpy as np
-import joblib
 
+from admission import AdmissionController
+from batching import MicroBatcher
+from compact_model import CompactSVC
+from metrics import metrics, stage_timer
+from model_registry import ModelRegistry
+from model_store import ModelStore, load_pickle
+from prediction_cache import PredictionCache
+import profiler
+from shadow import ShadowEvaluator
+from stream_server import StreamServer
+import wire_format
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
 app = Flask(__name__)
 
-MODEL_PATH = Path("/app/models/iris_model.pkl")
-WAIT_TIMEOUT = 60  # seconds
+MODEL_DIR = Path(os.environ.get("MODEL_DIR", "/app/models"))
+# "pickle" serves the joblib-pickled sklearn SVC; "compact" serves the NumPy
+# export train.py writes next to it, skipping sklearn's predict overhead. In
+# compact mode joblib and scikit-learn are never imported, which keeps start-up
+# fast and lets the slim image leave them out entirely.
+MODEL_FORMAT = os.environ.get("MODEL_FORMAT", "pickle")
+# The slim image (requirements-slim.txt) has neither joblib nor scikit-learn,
+# so it can only serve .npz exports.
+PICKLE_SUPPORTED = find_spec("joblib") is not None and find_spec("sklearn") is not None
+if MODEL_FORMAT == "pickle" and not PICKLE_SUPPORTED:
+    raise ValueError("MODEL_FORMAT=pickle needs joblib and scikit-learn; use 'compact'.")
+if MODEL_FORMAT == "compact":
+    MODEL_PATH, MODEL_LOADER = MODEL_DIR / "iris_model.npz", CompactSVC.load
+elif MODEL_FORMAT == "pickle":
+    MODEL_PATH, MODEL_LOADER = MODEL_DIR / "iris_model.pkl", load_pickle
+else:
+    raise ValueError(f"Unknown MODEL_FORMAT {MODEL_FORMAT!r}; use 'pickle' or 'compact'.")
+WAIT_TIMEOUT = 60  # seconds before warning that the model is still missing
 POLL_INTERVAL = 2  # seconds
+# Set to "r" to memory-map the model's NumPy arrays (support vectors, dual
+# coefficients, ...) so every worker process shares one read-only copy through
+# the page cache instead of holding a private one. Needs an uncompressed dump
+# that is replaced on update, never rewritten in place, as train.py does.
+MODEL_MMAP_MODE = os.environ.get("MODEL_MMAP_MODE") or None
+# Seconds between checks of the model file for a new version; 0 disables.
+MODEL_RELOAD_INTERVAL = float(os.environ.get("MODEL_RELOAD_INTERVAL", "5"))
+N_FEATURES = 4  # sepal length/width, petal length/width
+MAX_BATCH_ROWS = 10_000
+# Micro-batching of concurrent /predict calls; a max size of 1 disables it.
+MICROBATCH_MAX_SIZE = int(os.environ.get("MICROBATCH_MAX_SIZE", "1"))
+MICROBATCH_MAX_WAIT_US = int(os.environ.get("MICROBATCH_MAX_WAIT_US", "500"))
+# Prediction cache in front of the model; enabled when either size limit is set.
+PREDICTION_CACHE_SIZE = int(os.environ.get("PREDICTION_CACHE_SIZE", "0"))  # entries
+PREDICTION_CACHE_MAX_BYTES = int(os.environ.get("PREDICTION_CACHE_MAX_BYTES", "0"))
+PREDICTION_CACHE_TTL = float(os.environ.get("PREDICTION_CACHE_TTL", "300"))  # seconds
+PREDICTION_CACHE_DECIMALS = int(os.environ.get("PREDICTION_CACHE_DECIMALS", "4"))
+# Memory budget for the models served under /models/<name>/predict
+MODEL_REGISTRY_MAX_BYTES = int(os.environ.get("MODEL_REGISTRY_MAX_BYTES", str(512 * 1024 * 1024)))
+# Admission control for the prediction endpoints (0 disables each check):
+# concurrent requests per worker process, requests a worker has accepted but
+# not yet handed to a thread, and per-client requests/s with a burst. With
+# gthread workers a request only runs on one of INFERENCE_THREADS threads, so
+# ADMISSION_MAX_IN_FLIGHT must be below that to ever trigger; the waiting
+# queue is bounded by ADMISSION_MAX_QUEUE (see gunicorn.conf.py).
+ADMISSION_MAX_IN_FLIGHT = int(os.environ.get("ADMISSION_MAX_IN_FLIGHT", "0"))
+ADMISSION_MAX_QUEUE = int(os.environ.get("ADMISSION_MAX_QUEUE", "0"))
+RATE_LIMIT_RPS = float(os.environ.get("RATE_LIMIT_RPS", "0"))
+RATE_LIMIT_BURST = float(os.environ.get("RATE_LIMIT_BURST", "0"))
+# Clients are rate-limited by peer address. Behind N reverse proxies, set
+# TRUSTED_PROXY_COUNT=N so the address is taken from the last N X-Forwarded-For
+# hops those proxies appended (anything a client sends itself is ignored).
+TRUSTED_PROXY_COUNT = int(os.environ.get("TRUSTED_PROXY_COUNT", "0"))
+# Only when a trusted gateway sets X-Client-Id (and strips it from callers) may
+# it be used as the rate-limit key; otherwise any caller could pick its own key.
+TRUST_CLIENT_ID_HEADER = os.environ.get("TRUST_CLIENT_ID_HEADER", "0") == "1"
+# Candidate model to shadow-test against live traffic (.pkl or .npz); unset disables.
+SHADOW_MODEL_PATH = os.environ.get("SHADOW_MODEL_PATH")
+SHADOW_SAMPLE_RATE = float(os.environ.get("SHADOW_SAMPLE_RATE", "0.1"))
+SHADOW_QUEUE_SIZE = int(os.environ.get("SHADOW_QUEUE_SIZE", "1000"))
+SHADOW_WORKERS = int(os.environ.get("SHADOW_WORKERS", "1"))
+# Port of the length-prefixed TCP streaming endpoint (see stream_server.py); 0 disables.
+STREAM_PORT = int(os.environ.get("STREAM_PORT", "0"))
+
+
+model_store = ModelStore(MODEL_PATH, mmap_mode=MODEL_MMAP_MODE, loader=MODEL_LOADER)
+
 
+def load_model():
+    """Wait for the trained model to appear on the shared volume and load it.
 
-def load_model() -> object:
-    """Wait for the trained model to appear on the shared volume and load it."""
-    deadline = time.time() + WAIT_TIMEOUT
-    while time.time() < deadline:
+    Runs in a background thread so the HTTP server can bind and answer
+    /healthz right away; /readyz turns 200 once this has succeeded.
+    """
+    started = time.time()
+    warned = False
+    while model_store.current is None:
         if MODEL_PATH.exists():
-            return joblib.load(MODEL_PATH)
+            try:
+                model_store.load()
+                break
+            except Exception:
+                logger.exception("Failed to load %s; retrying", MODEL_PATH)
+        if not warned and time.time() - started > WAIT_TIMEOUT:
+            logger.warning(
+                "Model file not loaded from %s after %s seconds; still waiting.",
+                MODEL_PATH, WAIT_TIMEOUT,
+            )
+            warned = True
         time.sleep(POLL_INTERVAL)
 
-    raise FileNotFoundError(
-        f"Model file not found at {MODEL_PATH} after waiting {WAIT_TIMEOUT} seconds."
+    if MODEL_RELOAD_INTERVAL > 0:
+        model_store.watch(MODEL_RELOAD_INTERVAL)
+
+
+threading.Thread(target=load_model, name="model-loader", daemon=True).start()
+
+
+def registry_loaders() -> dict:
+    """Loader per artifact suffix; pickles only when they can be unpickled."""
+    loaders = {".npz": CompactSVC.load}
+    if PICKLE_SUPPORTED:
+        loaders[".pkl"] = load_pickle
+    return loaders
+
+
+# Every other artifact in MODEL_DIR (e.g. the lab6 housing regression) is served
+# from the registry; the primary model is shared with it, not loaded twice.
+model_registry = ModelRegistry(
+    MODEL_DIR,
+    registry_loaders(),
+    preferred_suffix=MODEL_PATH.suffix,
+    max_bytes=MODEL_REGISTRY_MAX_BYTES,
+    mmap_mode=MODEL_MMAP_MODE,
+    pinned={MODEL_PATH.stem: model_store},
+)
+
+
+def class_labels(loaded) -> np.ndarray:
+    """Label per class index, read from the artifact or its manifest.
+
+    Only an old artifact that carries neither falls back to the iris dataset
+    bundled with scikit-learn.
+    """
+    if loaded.target_names is not None:
+        return loaded.target_names
+    return _iris_target_names()
+
+
+@functools.lru_cache(maxsize=None)
+def _iris_target_names() -> np.ndarray:
+    from sklearn import datasets
+
+    return datasets.load_iris().target_names
+
+
+def predict_indices(matrix: np.ndarray) -> np.ndarray:
+    """Run the model on an N x 4 matrix and return integer class indices."""
+    return model_store.current.model.predict(matrix).astype(int)
+
+
+batcher = (
+    MicroBatcher(predict_indices, MICROBATCH_MAX_SIZE, MICROBATCH_MAX_WAIT_US)
+    if MICROBATCH_MAX_SIZE > 1
+    else None
+)
+
+prediction_cache = (
+    PredictionCache(
+        PREDICTION_CACHE_SIZE,
+        PREDICTION_CACHE_MAX_BYTES,
+        PREDICTION_CACHE_TTL,
+        PREDICTION_CACHE_DECIMALS,
+    )
+    if PREDICTION_CACHE_SIZE > 0 or PREDICTION_CACHE_MAX_BYTES > 0
+    else None
+)
+
+shadow = None
+if SHADOW_MODEL_PATH:
+    shadow_path = Path(SHADOW_MODEL_PATH)
+    if shadow_path.suffix != ".npz" and not PICKLE_SUPPORTED:
+        raise ValueError(
+            f"SHADOW_MODEL_PATH={shadow_path} needs joblib and scikit-learn; use an .npz export."
+        )
+    shadow = ShadowEvaluator(
+        ModelStore(
+            shadow_path,
+            mmap_mode=MODEL_MMAP_MODE,
+            loader=CompactSVC.load if shadow_path.suffix == ".npz" else load_pickle,
+        ),
+        model_store,
+        sample_rate=SHADOW_SAMPLE_RATE,
+        queue_size=SHADOW_QUEUE_SIZE,
+        workers=SHADOW_WORKERS,
     )
 
 
-model = load_model()
-target_names = datasets.load_iris().target_names
+def run_model(matrix: np.ndarray) -> np.ndarray:
+    """Predict class indices, routing single rows through the micro-batcher."""
+    if batcher is not None and len(matrix) == 1:
+        return np.array([batcher.predict(matrix[0])])
+    return predict_indices(matrix)
+
+
+def predict_rows(matrix: np.ndarray) -> np.ndarray:
+    """Predict class indices, mirroring a sample of calls to the shadow model."""
+    if shadow is None:
+        return cached_predict(matrix)
+    indices = cached_predict(matrix)
+    shadow.mirror(matrix, indices)
+    return indices
+
+
+def cached_predict(matrix: np.ndarray) -> np.ndarray:
+    """Answer rows from the prediction cache and run the model on the rest."""
+    if prediction_cache is None:
+        return run_model(matrix)
+
+    version = model_store.current.version
+    keys = [prediction_cache.key(row) for row in matrix]
+    indices = np.empty(len(matrix), dtype=int)
+    missing = []
+    for position, key in enumerate(keys):
+        cached = prediction_cache.get(version, key)
+        if cached is None:
+            missing.append(position)
+        else:
+            indices[position] = cached
+
+    if missing:
+        fresh = run_model(matrix[missing])
+        indices[missing] = fresh
+        for position, value in zip(missing, fresh.tolist()):
+            prediction_cache.put(version, keys[position], value)
+    return indices
+
+
+def predict_or_flag(matrix: np.ndarray) -> np.ndarray:
+    """Class index per row, or -1 for rows with non-finite values."""
+    valid = np.isfinite(matrix).all(axis=1)
+    indices = np.full(len(matrix), -1, dtype=wire_format.INDEX_DTYPE)
+    if valid.any():
+        indices[valid] = predict_rows(matrix[valid])
+    return indices
+
+
+if STREAM_PORT:
+    StreamServer(
+        ("0.0.0.0", STREAM_PORT),
+        predict_or_flag,
+        is_ready=lambda: model_store.current is not None,
+        n_features=N_FEATURES,
+        max_rows=MAX_BATCH_ROWS,
+        logger=logger,
+    ).serve_in_background()
+
+
+# Endpoints that need a loaded model; they answer 503 until /readyz is green.
+MODEL_ENDPOINTS = {"predict", "predict_batch", "model_info"}
+
+
+@app.before_request
+def require_model():
+    if request.endpoint in MODEL_ENDPOINTS and model_store.current is None:
+        response = jsonify({"error": "Model is not loaded yet."})
+        response.headers["Retry-After"] = str(POLL_INTERVAL)
+        return response, 503
+    return None
+
+admission = AdmissionController(
+    ADMISSION_MAX_IN_FLIGHT, RATE_LIMIT_RPS, RATE_LIMIT_BURST, max_queue=ADMISSION_MAX_QUEUE
+)
+ADMISSION_ENDPOINTS = {"predict", "predict_batch", "predict_named", "profile"}
+
+
+if TRUSTED_PROXY_COUNT > 0:
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=TRUSTED_PROXY_COUNT)
+
+
+def client_id() -> str:
+    """Rate-limit key: the client address (after ProxyFix), or a trusted X-Client-Id."""
+    if TRUST_CLIENT_ID_HEADER and request.headers.get("X-Client-Id"):
+        return "id:" + request.headers["X-Client-Id"]
+    return request.remote_addr or "unknown"
+
+
+@app.before_request
+def admit_request():
+    if request.endpoint not in ADMISSION_ENDPOINTS:
+        return None
+    rejection = admission.admit(client_id())
+    if rejection is None:
+        g.admitted = True
+        return None
+    status, retry_after = rejection
+    message = "Rate limit exceeded." if status == 429 else "Server is overloaded."
+    response = jsonify({"error": message})
+    response.headers["Retry-After"] = str(max(1, math.ceil(retry_after)))
+    return response, status
+
+
+@app.teardown_request
+def release_request(exc):
+    if g.pop("admitted", False):
+        admission.release()
+
+
+@app.route("/admission", methods=["GET"])
+def admission_stats():
+    """In-flight requests, queue depth and rejection counters, for autoscaling.
+
+    Every gunicorn worker keeps its own counters, so each response covers only
+    the worker (``pid``) that answered it.
+    """
+    return jsonify({
+        "scope": "worker",
+        "pid": os.getpid(),
+        **admission.stats(),
+        "batch_queue_depth": batcher.queue_depth if batcher is not None else 0,
+    })
+
+
+@app.route("/healthz", methods=["GET"])
+def healthz():
+    """Liveness: the process is up and serving HTTP."""
+    return jsonify({"status": "ok"})
+
+
+@app.route("/readyz", methods=["GET"])
+def readyz():
+    """Readiness: a model is loaded and predictions can be served."""
+    current = model_store.current
+    if current is None:
+        return jsonify({"status": "loading"}), 503
+    return jsonify({"status": "ready", "version": current.version})
+
+
+class MalformedJSON(ValueError):
+    """The request declared a JSON body that could not be decoded."""
+
+
+@app.errorhandler(MalformedJSON)
+def malformed_json(exc):
+    return jsonify({"error": "Malformed JSON body."}), 400
+
+
+def read_json_payload():
+    """Parse a JSON body with the fast codec; ``None`` if it is not JSON.
+
+    Raises :class:`MalformedJSON` (answered with 400) if it cannot be decoded.
+    """
+    if not request.is_json:
+        return None
+    try:
+        return wire_format.loads_json(request.get_data(cache=False))
+    except ValueError as exc:
+        raise MalformedJSON(str(exc)) from exc
+
+
+def json_response(obj) -> Response:
+    return Response(wire_format.dumps_json(obj), mimetype=wire_format.JSON_MIMETYPE)
+
+
+def read_ndarray_payload() -> np.ndarray:
+    """Decode a raw ``application/x-ndarray`` body into an N x 4 matrix."""
+    dtype = wire_format.ndarray_dtype(request.mimetype_params)
+    return wire_format.decode_matrix(request.get_data(cache=False), dtype, N_FEATURES)
+
+
+def ndarray_response(indices: np.ndarray) -> Response:
+    return Response(
+        wire_format.encode_indices(indices),
+        content_type=f"{wire_format.NDARRAY_MIMETYPE}; dtype=int32",
+    )
 
 
 @app.route("/predict", methods=["POST"])
 def predict():
-    payload = request.get_json(silent=True)
-    if not payload or "input" not in payload:
+    if request.mimetype == wire_format.NDARRAY_MIMETYPE:
+        return predict_ndarray(single=True)
+
+    with stage_timer("predict", "parse"):
+        payload = read_json_payload()
+    if not isinstance(payload, dict) or "input" not in payload:
         return jsonify({"error": "Request body must include an 'input' list."}), 400
 
     try:
-        iris_input = np.array(payload["input"], dtype=float).reshape(1, -1)
+        with stage_timer("predict", "convert"):
+            iris_input = np.array(payload["input"], dtype=float).reshape(1, -1)
     except (ValueError, TypeError):
         return jsonify({"error": "Input array must contain numeric values."}), 400
 
     if iris_input.shape[1] != 4:
         return jsonify({"error": "Expected 4 numeric values for the iris features."}), 400
+    if not np.isfinite(iris_input).all():
+        return jsonify({"error": "Input values must be finite numbers."}), 400
+
+    with stage_timer("predict", "model"):
+        prediction_idx = int(predict_rows(iris_input)[0])
+    with stage_timer("predict", "lookup"):
+        prediction_label = str(class_labels(model_store.current)[prediction_idx])
+
+    with stage_timer("predict", "render"):
+        return json_response({"prediction": prediction_label, "class_index": prediction_idx})
+
+
+def predict_ndarray(single: bool):
+    """Binary fast path: raw float rows in, raw int32 class indices out."""
+    endpoint = "predict" if single else "predict_batch"
+    try:
+        with stage_timer(endpoint, "parse"):
+            matrix = read_ndarray_payload()
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+    if single and len(matrix) != 1:
+        return jsonify({"error": "Expected 4 numeric values for the iris features."}), 400
+    if len(matrix) > MAX_BATCH_ROWS:
+        return jsonify({"error": f"Batch size exceeds the limit of {MAX_BATCH_ROWS} rows."}), 400
+
+    if single and not np.isfinite(matrix).all():
+        return jsonify({"error": "Input values must be finite numbers."}), 400
+    with stage_timer(endpoint, "model"):
+        indices = predict_or_flag(matrix)
+    with stage_timer(endpoint, "render"):
+        return ndarray_response(indices)
+
+
+def _validate_row(row):
+    """Convert one batch row to a feature vector, or return an error message."""
+    if isinstance(row, dict):
+        if "input" not in row:
+            return None, "Row object must include an 'input' list."
+        row = row["input"]
+
+    try:
+        vector = np.array(row, dtype=float).reshape(-1)
+    except (ValueError, TypeError):
+        return None, "Input array must contain numeric values."
+
+    if vector.shape[0] != N_FEATURES:
+        return None, "Expected 4 numeric values for the iris features."
+    if not np.isfinite(vector).all():
+        return None, "Input values must be finite numbers."
+    return vector, None
+
+
+def _batch_matrix(rows):
+    """Fast path: the whole batch is already a clean N x 4 numeric matrix."""
+    try:
+        matrix = np.array(rows, dtype=float)
+    except (ValueError, TypeError):
+        return None
+    if matrix.ndim != 2 or matrix.shape[1] != N_FEATURES:
+        return None
+    if not np.isfinite(matrix).all():
+        return None
+    return matrix
+
 
-    prediction_idx = int(model.predict(iris_input)[0])
-    prediction_label = target_names[prediction_idx]
+@app.route("/predict/batch", methods=["POST"])
+def predict_batch():
+    """Predict many rows with a single vectorized ``model.predict`` call.
+
+    Accepts ``{"inputs": [[...], ...]}`` (an N x 4 matrix) or
+    ``{"inputs": [{"input": [...]}, ...]}``. Invalid rows get their own
+    ``error`` entry instead of failing the whole batch. An
+    ``application/x-ndarray`` body is answered in the binary format instead.
+    """
+    if request.mimetype == wire_format.NDARRAY_MIMETYPE:
+        return predict_ndarray(single=False)
+
+    with stage_timer("predict_batch", "parse"):
+        payload = read_json_payload()
+    rows = payload.get("inputs") if isinstance(payload, dict) else None
+    if not isinstance(rows, list) or not rows:
+        return jsonify({"error": "Request body must include a non-empty 'inputs' list."}), 400
+    if len(rows) > MAX_BATCH_ROWS:
+        return jsonify({"error": f"Batch size exceeds the limit of {MAX_BATCH_ROWS} rows."}), 400
+
+    results = [None] * len(rows)
+    with stage_timer("predict_batch", "convert"):
+        matrix = _batch_matrix(rows)
+    if matrix is not None:
+        valid_positions = list(range(len(rows)))
+    else:
+        vectors, valid_positions = [], []
+        for position, row in enumerate(rows):
+            vector, error = _validate_row(row)
+            if error is not None:
+                results[position] = {"error": error}
+            else:
+                vectors.append(vector)
+                valid_positions.append(position)
+        matrix = np.vstack(vectors) if vectors else None
+
+    if matrix is not None:
+        with stage_timer("predict_batch", "model"):
+            indices = predict_rows(matrix)
+        with stage_timer("predict_batch", "lookup"):
+            labels = class_labels(model_store.current)[indices]
+        for position, idx, label in zip(valid_positions, indices.tolist(), labels.tolist()):
+            results[position] = {"prediction": label, "class_index": idx}
+
+    with stage_timer("predict_batch", "render"):
+        return json_response({
+            "predictions": results,
+            "count": len(rows),
+            "errors": len(rows) - len(valid_positions),
+        })
+
+
+@app.route("/model", methods=["GET"])
+def model_info():
+    """Report which model version is being served and when it was loaded."""
+    current = model_store.current
+    return jsonify({
+        "path": str(model_store.path),
+        "version": current.version,
+        "loaded_at": current.loaded_at.isoformat(),
+        "reloads": model_store.reloads,
+        "manifest": current.manifest,
+    })
+
+@app.route("/models", methods=["GET"])
+def list_models():
+    """Models found in the model directory and which of them are in memory."""
+    return jsonify(model_registry.describe())
+
+
+@app.route("/models/<name>/predict", methods=["POST"])
+def predict_named(name):
+    """Predict with any model in the registry.
+
+    Takes ``{"input": [...]}`` or ``{"inputs": [[...], ...]}`` and answers with
+    raw predictions, plus labels when the model's manifest names its classes.
+    """
+    try:
+        loaded = model_registry.get(name)
+    except Exception:
+        logger.exception("Failed to load model %s", name)
+        return jsonify({"error": f"Model '{name}' could not be loaded."}), 503
+    if loaded is None:
+        if name == MODEL_PATH.stem:
+            return jsonify({"error": "Model is not loaded yet."}), 503
+        return jsonify({"error": f"Unknown model '{name}'."}), 404
+
+    payload = read_json_payload()
+    if isinstance(payload, dict) and "inputs" in payload:
+        rows = payload["inputs"]
+    elif isinstance(payload, dict) and "input" in payload:
+        rows = [payload["input"]]
+    else:
+        return jsonify({"error": "Request body must include an 'input' or 'inputs' list."}), 400
+    try:
+        matrix = np.array(rows, dtype=float)
+    except (ValueError, TypeError):
+        return jsonify({"error": "Input array must contain numeric values."}), 400
+
+    n_features = getattr(loaded.model, "n_features_in_", None)
+    if matrix.ndim != 2 or not len(matrix) or (n_features and matrix.shape[1] != n_features):
+        return jsonify({"error": f"Expected rows of {n_features or 'equal-length'} numeric values."}), 400
+    if not np.isfinite(matrix).all():
+        return jsonify({"error": "Input values must be finite numbers."}), 400
+    if len(matrix) > MAX_BATCH_ROWS:
+        return jsonify({"error": f"Batch size exceeds the limit of {MAX_BATCH_ROWS} rows."}), 400
+
+    if name == MODEL_PATH.stem:
+        predictions = predict_rows(matrix)
+    else:
+        predictions = loaded.model.predict(matrix)
+    result = {"model": name, "version": loaded.version, "predictions": predictions.tolist()}
+    names = loaded.target_names
+    if names is not None and np.issubdtype(predictions.dtype, np.integer):
+        result["labels"] = names[predictions].tolist()
+    return json_response(result)
+
+
+@app.route("/shadow", methods=["GET"])
+def shadow_stats():
+    """Agreement rate and latencies of the shadow candidate vs the served model."""
+    if shadow is None:
+        return jsonify({"enabled": False})
+    return jsonify({"enabled": True, **shadow.stats()})
+
+
+@app.route("/cache", methods=["GET"])
+def cache_stats():
+    """Hit, miss and eviction counters of the prediction cache."""
+    if prediction_cache is None:
+        return jsonify({"enabled": False})
+    return jsonify({"enabled": True, **prediction_cache.stats()})
+
+app.add_url_rule("/metrics", "metrics", metrics)
+
+# /debug/profile exposes internal stack frames and ties up a request thread, so
+# it is off unless PROFILE_TOKEN is set; callers must then send that token in
+# the X-Profile-Token header.
+PROFILE_TOKEN = os.environ.get("PROFILE_TOKEN", "")
+# Keep a profile well inside gunicorn's worker timeout, which would otherwise
+# kill the worker while it is busy profiling.
+INFERENCE_TIMEOUT = int(os.environ.get("INFERENCE_TIMEOUT", "30"))
+PROFILE_MAX_SECONDS = max(1.0, INFERENCE_TIMEOUT / 2) if INFERENCE_TIMEOUT > 0 else 60.0
+
+
+@app.route("/debug/profile", methods=["POST"])
+def profile():
+    """Sample this worker's threads for a while and return collapsed stacks.
+
+    ``?seconds=5&interval_ms=5`` sets the duration (at most half of
+    ``INFERENCE_TIMEOUT``) and the sampling period. Only the worker that
+    receives the request is profiled; sync and gevent workers are refused
+    with 501. Answers 404 unless ``PROFILE_TOKEN`` is set and sent.
+    """
+    token = request.headers.get("X-Profile-Token", "")
+    if not PROFILE_TOKEN or not hmac.compare_digest(token.encode(), PROFILE_TOKEN.encode()):
+        return jsonify({"error": "Not found."}), 404
+    reason = profiler.unsupported_reason(request.environ)
+    if reason is not None:
+        return jsonify({"error": reason}), 501
+    try:
+        seconds = float(request.args.get("seconds", "5"))
+        interval = float(request.args.get("interval_ms", "5")) / 1000
+    except ValueError:
+        return jsonify({"error": "seconds and interval_ms must be numbers."}), 400
+    if not (0 < seconds <= PROFILE_MAX_SECONDS and 0 < interval <= seconds):
+        return jsonify({"error": f"seconds must be in (0, {PROFILE_MAX_SECONDS:g}] "
+                                 "and interval_ms positive and shorter than it."}), 400
+    try:
+        counts = profiler.sample_stacks(seconds, interval)
+    except profiler.ProfilerBusy as exc:
+        return jsonify({"error": str(exc)}), 409
+    return Response(profiler.format_collapsed(counts), mimetype="text/plain")
 
-    return jsonify({"prediction": prediction_label, "class_index": prediction_idx})
 
 @app.route('/')
 def hello():
@@ -55,4 +648,4 @@ def hello():
 
 if __name__ == '__main__':
     #Run the Flask app (bind it to port 8080 or any other port)
-    app.run(debug=True, port=8080, host='0.0.0.0')
+    app.run(debug=True, port=int(os.environ.get("PORT", "8080")), host='0.0.0.0')
@@ -0,0 +1,129 @@
+"""Mirror a sample of live traffic to a candidate model, off the request path."""
+from collections import deque
+import logging
+import queue
+import random
+import threading
+import time
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def _latency_summary(samples) -> dict:
+    if not samples:
+        return {"count": 0}
+    ms = np.array(samples) * 1000
+    return {
+        "count": len(ms),
+        "mean_ms": round(float(ms.mean()), 4),
+        "p50_ms": round(float(np.percentile(ms, 50)), 4),
+        "p95_ms": round(float(np.percentile(ms, 95)), 4),
+        "p99_ms": round(float(np.percentile(ms, 99)), 4),
+    }
+
+
+class ShadowEvaluator:
+    """Compare a candidate model against the served one on sampled requests.
+
+    :meth:`mirror` costs the request one random draw and, for sampled
+    requests, a non-blocking enqueue; when the bounded queue is full the
+    sample is dropped rather than slowing the caller down. Background workers
+    run the candidate on the same rows and record how often it agrees with
+    the served predictions. For the latency comparison they also time the
+    served model's bare ``predict`` on those rows in the same thread, so
+    neither number includes the request path's cache or micro-batching.
+    """
+
+    def __init__(self, candidate_store, primary_store, sample_rate=0.1, queue_size=1000,
+                 workers=1, window=10_000):
+        self.candidate_store = candidate_store
+        self.primary_store = primary_store
+        self.sample_rate = sample_rate
+        self.workers = workers
+        self.mirrored = 0
+        self.dropped = 0
+        self.failed = 0
+        self.rows_compared = 0
+        self.rows_agreed = 0
+        self._primary_latency = deque(maxlen=window)
+        self._candidate_latency = deque(maxlen=window)
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._lock = threading.Lock()
+        self._threads = []
+
+    def mirror(self, matrix: np.ndarray, primary: np.ndarray):
+        """Maybe queue ``matrix`` (already answered with ``primary``) for the candidate."""
+        if random.random() >= self.sample_rate:
+            return
+        self._ensure_workers()
+        try:
+            self._queue.put_nowait((matrix, primary))
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            return
+        with self._lock:
+            self.mirrored += 1
+
+    def _ensure_workers(self):
+        # Started lazily so every worker process gets its own pool after fork.
+        if self._threads:
+            return
+        with self._lock:
+            if not self._threads:
+                self._threads = [
+                    threading.Thread(target=self._run, name=f"shadow-{n}", daemon=True)
+                    for n in range(self.workers)
+                ]
+                for thread in self._threads:
+                    thread.start()
+
+    def _candidate(self):
+        store = self.candidate_store
+        if store.current is None or store.is_stale():
+            store.load()
+        return store.current.model
+
+    def _run(self):
+        while True:
+            matrix, primary = self._queue.get()
+            try:
+                model = self._candidate()
+                served = self.primary_store.current.model
+                started = time.perf_counter()
+                served.predict(matrix)
+                primary_latency = time.perf_counter() - started
+                started = time.perf_counter()
+                candidate = np.asarray(model.predict(matrix)).astype(int)
+                candidate_latency = time.perf_counter() - started
+            except Exception:
+                logger.exception("Shadow prediction failed")
+                with self._lock:
+                    self.failed += 1
+                continue
+            with self._lock:
+                self.rows_compared += len(primary)
+                self.rows_agreed += int((candidate == primary).sum())
+                self._primary_latency.append(primary_latency)
+                self._candidate_latency.append(candidate_latency)
+
+    def stats(self) -> dict:
+        with self._lock:
+            current = self.candidate_store.current
+            return {
+                "candidate_path": str(self.candidate_store.path),
+                "candidate_version": current.version if current else None,
+                "sample_rate": self.sample_rate,
+                "mirrored": self.mirrored,
+                "dropped": self.dropped,
+                "failed": self.failed,
+                "queue_depth": self._queue.qsize(),
+                "rows_compared": self.rows_compared,
+                "agreement_rate": (
+                    self.rows_agreed / self.rows_compared if self.rows_compared else None
+                ),
+                "primary_latency": _latency_summary(list(self._primary_latency)),
+                "candidate_latency": _latency_summary(list(self._candidate_latency)),
+            }
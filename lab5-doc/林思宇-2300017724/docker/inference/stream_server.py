@@ -0,0 +1,138 @@
+"""Length-prefixed TCP streaming front end for the inference service.
+
+One long-lived connection carries any number of request frames; the server
+answers each frame, in order, with one response frame.
+
+* Request: ``<uint32 n_rows>`` followed by ``n_rows * n_features`` little-endian
+  float64 values (row-major).
+* Response: ``<uint8 status><uint32 n_rows>`` followed by ``n_rows``
+  little-endian int32 class indices (``-1`` for rows that could not be scored).
+  Non-OK responses carry no indices.
+
+Clients may pipeline: write frames without waiting for the replies. Frames
+that reach the server together are scored with one model call.
+"""
+import socket
+import socketserver
+import struct
+import threading
+
+import numpy as np
+
+import wire_format
+
+REQUEST_HEADER = struct.Struct("<I")
+RESPONSE_HEADER = struct.Struct("<BI")
+FLOAT_DTYPE = np.dtype("<f8")
+RECV_SIZE = 1 << 16
+
+STATUS_OK = 0
+STATUS_NOT_READY = 1  # no model loaded yet; retry later
+STATUS_BAD_FRAME = 2  # empty or oversized frame; the server closes the connection
+STATUS_ERROR = 3  # prediction failed
+
+
+class _FrameHandler(socketserver.BaseRequestHandler):
+    """Serve one connection, scoring all frames that arrive together in one call."""
+
+    def handle(self):
+        server = self.server
+        sock = self.request
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        row_bytes = FLOAT_DTYPE.itemsize * server.n_features
+        buffer = bytearray()
+        while True:
+            chunk = sock.recv(RECV_SIZE)
+            if not chunk:
+                return
+            buffer += chunk
+
+            # Split off every complete frame; pipelined frames are predicted together.
+            sizes, payload, offset = [], [], 0
+            while len(buffer) - offset >= REQUEST_HEADER.size:
+                (n_rows,) = REQUEST_HEADER.unpack_from(buffer, offset)
+                if n_rows == 0 or n_rows > server.max_rows:
+                    sock.sendall(RESPONSE_HEADER.pack(STATUS_BAD_FRAME, 0))
+                    return
+                end = offset + REQUEST_HEADER.size + n_rows * row_bytes
+                if len(buffer) < end:
+                    break
+                sizes.append(n_rows)
+                payload.append(bytes(buffer[offset + REQUEST_HEADER.size:end]))
+                offset = end
+            del buffer[:offset]
+            if sizes:
+                sock.sendall(self._score(sizes, b"".join(payload)))
+
+    def _score(self, sizes, payload):
+        server = self.server
+        if not server.is_ready():
+            return RESPONSE_HEADER.pack(STATUS_NOT_READY, 0) * len(sizes)
+        matrix = wire_format.decode_matrix(payload, FLOAT_DTYPE, server.n_features)
+        try:
+            indices = server.predict_fn(matrix)
+        except Exception:
+            server.logger.exception("Stream prediction failed")
+            return RESPONSE_HEADER.pack(STATUS_ERROR, 0) * len(sizes)
+
+        replies, start = [], 0
+        for n_rows in sizes:
+            replies.append(RESPONSE_HEADER.pack(STATUS_OK, n_rows))
+            replies.append(wire_format.encode_indices(indices[start:start + n_rows]))
+            start += n_rows
+        return b"".join(replies)
+
+
+class StreamServer(socketserver.ThreadingTCPServer):
+    """Threaded frame server sharing the HTTP app's model and batching path.
+
+    ``SO_REUSEPORT`` lets every pre-forked gunicorn worker bind the same port;
+    the kernel spreads incoming connections across them.
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address, predict_fn, is_ready, n_features, max_rows, logger):
+        self.predict_fn = predict_fn
+        self.is_ready = is_ready
+        self.n_features = n_features
+        self.max_rows = max_rows
+        self.logger = logger
+        super().__init__(address, _FrameHandler)
+
+    def server_bind(self):
+        if hasattr(socket, "SO_REUSEPORT"):
+            self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        super().server_bind()
+
+    def serve_in_background(self):
+        thread = threading.Thread(target=self.serve_forever, name="stream-server", daemon=True)
+        thread.start()
+        return thread
+
+
+class StreamClient:
+    """Minimal blocking client: ``send`` frames, then ``receive`` their replies in order."""
+
+    def __init__(self, host, port, timeout=30):
+        self.sock = socket.create_connection((host, port), timeout=timeout)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._reader = self.sock.makefile("rb")
+
+    def send(self, matrix):
+        matrix = np.ascontiguousarray(matrix, dtype=FLOAT_DTYPE)
+        self.sock.sendall(REQUEST_HEADER.pack(len(matrix)) + matrix.tobytes())
+
+    def receive(self):
+        """Return ``(status, indices)`` for the oldest unanswered frame."""
+        header = self._reader.read(RESPONSE_HEADER.size)
+        if len(header) < RESPONSE_HEADER.size:
+            raise ConnectionError("Stream closed by the server.")
+        status, n_rows = RESPONSE_HEADER.unpack(header)
+        body = self._reader.read(n_rows * wire_format.INDEX_DTYPE.itemsize)
+        return status, np.frombuffer(body, dtype=wire_format.INDEX_DTYPE)
+
+    def close(self):
+        self._reader.close()
+        self.sock.close()
@@ -0,0 +1,62 @@
+"""Request/response codecs for the prediction endpoints, chosen by Content-Type.
+
+* ``application/json``: parsed and rendered with orjson when it is installed,
+  falling back to the standard library (which also accepts ``NaN`` and
+  ``Infinity``).
+* ``application/x-ndarray; dtype=float32|float64``: a raw little-endian buffer
+  of row-major feature vectors, decoded straight into NumPy with
+  ``np.frombuffer``. Predictions come back as a little-endian int32 buffer of
+  class indices (``-1`` for rows that could not be scored).
+"""
+import json
+
+import numpy as np
+
+try:
+    import orjson
+except ImportError:  # optional speedup
+    orjson = None
+
+JSON_MIMETYPE = "application/json"
+NDARRAY_MIMETYPE = "application/x-ndarray"
+NDARRAY_DTYPES = {"float32": np.dtype("<f4"), "float64": np.dtype("<f8")}
+INDEX_DTYPE = np.dtype("<i4")
+
+
+def loads_json(data: bytes):
+    """Decode a JSON body; raises ``ValueError`` if it is not valid JSON."""
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            # orjson rejects the NaN/Infinity literals the json module (and
+            # Flask's get_json) accept; only such bodies pay for a second parse.
+            pass
+    return json.loads(data)
+
+
+def dumps_json(obj) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(",", ":")).encode()
+
+
+def ndarray_dtype(mimetype_params) -> np.dtype:
+    """Look up the element type named by the ``dtype`` Content-Type parameter."""
+    name = mimetype_params.get("dtype", "float64")
+    if name not in NDARRAY_DTYPES:
+        raise ValueError(f"Unsupported dtype {name!r}; use 'float32' or 'float64'.")
+    return NDARRAY_DTYPES[name]
+
+
+def decode_matrix(data: bytes, dtype: np.dtype, n_features: int) -> np.ndarray:
+    """View a raw buffer as an N x ``n_features`` float matrix without parsing."""
+    row_bytes = dtype.itemsize * n_features
+    if not data or len(data) % row_bytes:
+        raise ValueError(f"Body must be a non-empty multiple of {row_bytes} bytes.")
+    matrix = np.frombuffer(data, dtype=dtype).reshape(-1, n_features)
+    return matrix.astype(float, copy=False)
+
+
+def encode_indices(indices: np.ndarray) -> bytes:
+    return np.asarray(indices, dtype=INDEX_DTYPE).tobytes()
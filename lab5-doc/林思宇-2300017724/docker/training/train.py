@@ -1,22 +1,514 @@
+from datetime import datetime, timezone
 from pathlib import Path
+import argparse
+import hashlib
+import io
+import itertools
+import json
+import os
+import platform
+import shutil
+import tempfile
+import time
 
+import numpy as np
+import pandas as pd
+import sklearn
 from sklearn import datasets
+from sklearn.linear_model import SGDClassifier
+from sklearn.model_selection import StratifiedKFold
+from sklearn.preprocessing import StandardScaler
 from sklearn.svm import SVC
 import joblib
 
-# Load the Iris dataset
-iris = datasets.load_iris()
+MODEL_DIR = Path(os.environ.get("MODEL_DIR", "/app/models"))
+MODEL_NAME = "iris_model.pkl"
+COMPACT_NAME = "iris_model.npz"
+MANIFEST_NAME = "latest.json"
+SEARCH_REPORT_NAME = "search_report.json"
+# Bump whenever publish_model()/export_compact() change what they write (2: the
+# .npz carries target_names), so an unchanged training run still republishes.
+ARTIFACT_FORMAT = 2
+# How many published versions to keep under versions/ (the served one always stays)
+KEEP_VERSIONS = int(os.environ.get("KEEP_VERSIONS", "5"))
 
-# Create and train an SVM classifier on the iris dataset
-clf = SVC()
-model = clf.fit(iris.data, iris.target)
+# mkstemp creates files as 0600; published files get the mode open() would give
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+FILE_MODE = 0o644 & ~_UMASK
 
-# Save the trained model to the shared volume
-model_dir = Path("/app/models")
-model_dir.mkdir(parents=True, exist_ok=True)
-model_path = model_dir / "iris_model.pkl"
-joblib.dump(model, model_path)
+# Hyperparameter grid for --mode search. Kernels are limited to the ones the
+# compact NumPy export can evaluate.
+SEARCH_GRID = {
+    "rbf": {"C": [0.1, 1.0, 10.0, 100.0], "gamma": ["scale", 0.01, 0.1, 1.0]},
+    "linear": {"C": [0.01, 0.1, 1.0, 10.0]},
+}
 
-print(f"Model training complete and saved as {model_path}")
 
+def atomic_write_bytes(path: Path, data: bytes):
+    """Write ``data`` to a temp file next to ``path``, fsync it and rename it into place.
 
+    Readers on the shared volume see either the old file or the complete new
+    one, never a partially written pickle. The file is made world-readable
+    (subject to the umask) so a non-root inference container can load it.
+    """
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as tmp:
+            tmp.write(data)
+            tmp.flush()
+            os.fsync(tmp.fileno())
+        os.chmod(tmp_name, FILE_MODE)
+        os.replace(tmp_name, path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+
+    # Persist the rename itself
+    dir_fd = os.open(path.parent, os.O_RDONLY)
+    try:
+        os.fsync(dir_fd)
+    finally:
+        os.close(dir_fd)
+
+
+def export_compact(model, target_names=None) -> bytes:
+    """Serialize the fitted model's decision function as plain NumPy arrays (.npz).
+
+    The inference server evaluates these with ``compact_model.CompactSVC``
+    without unpickling or importing scikit-learn. For an SVC the arrays are
+    libsvm's raw coefficients: scikit-learn flips the sign of ``dual_coef_``
+    and ``intercept_`` for binary problems, so that is undone here. Linear
+    models are handled by :func:`linear_as_svc`. ``target_names`` are stored
+    as a plain string array so the server can label predictions without
+    loading the dataset.
+    """
+    if not hasattr(model, "support_vectors_"):
+        arrays = linear_as_svc(model)
+    else:
+        sign = -1.0 if len(model.classes_) == 2 else 1.0
+        arrays = dict(
+            support_vectors=model.support_vectors_,
+            dual_coef=sign * model.dual_coef_,
+            intercept=sign * model.intercept_,
+            n_support=model.n_support_,
+            classes=model.classes_,
+            kernel=np.array(model.kernel),
+            gamma=np.array(model._gamma),
+        )
+    if target_names is not None:
+        arrays["target_names"] = np.array(target_names, dtype=str)
+    buffer = io.BytesIO()
+    np.savez(buffer, **arrays)
+    return buffer.getvalue()
+
+
+def linear_as_svc(model) -> dict:
+    """Express a one-vs-rest linear classifier in the compact SVC layout.
+
+    With per-class scores ``f_k(x) = w_k . x + b_k``, one "support vector"
+    ``w_k`` per class and a linear kernel, the one-vs-one decision for the
+    pair ``(i, j)`` becomes ``f_i(x) - f_j(x)``; the class with the highest
+    score wins every pair it is in, so the vote reproduces ``argmax_k f_k``.
+    """
+    coef = np.atleast_2d(model.coef_)
+    intercept = np.ravel(model.intercept_)
+    if len(model.classes_) == 2:  # a single score for class 1; class 0 scores 0
+        coef = np.vstack([np.zeros_like(coef), coef])
+        intercept = np.concatenate([[0.0], intercept])
+
+    n_classes = len(model.classes_)
+    # Class k's weight vector enters pair (i, j) with +1 as i and -1 as j.
+    rows = np.arange(n_classes - 1)[:, None]
+    dual_coef = np.where(rows >= np.arange(n_classes)[None, :], 1.0, -1.0)
+    pair_intercepts = [
+        intercept[i] - intercept[j] for i in range(n_classes) for j in range(i + 1, n_classes)
+    ]
+    return dict(
+        support_vectors=coef,
+        dual_coef=dual_coef,
+        intercept=np.array(pair_intercepts),
+        n_support=np.ones(n_classes, dtype=np.int32),
+        classes=model.classes_,
+        kernel=np.array("linear"),
+        gamma=np.array(1.0),
+    )
+
+
+def publish_model(model, model_dir: Path, feature_names, target_names, metadata=None) -> dict:
+    """Store ``model`` under a content-addressed version and point ``latest`` at it.
+
+    Writes ``versions/<version>/`` (the pickle plus its compact ``.npz``
+    export), then the ``latest.json`` manifest, then the top-level copies that
+    inference loads, each atomically. Returns the manifest.
+    """
+    buffer = io.BytesIO()
+    # Keep the dump uncompressed so inference workers can memory-map its arrays
+    joblib.dump(model, buffer, compress=0)
+    data = buffer.getvalue()
+    checksum = hashlib.sha256(data).hexdigest()
+    version = checksum[:12]
+
+    compact = export_compact(model, target_names)
+
+    version_path = model_dir / "versions" / version / MODEL_NAME
+    compact_path = version_path.with_name(COMPACT_NAME)
+    version_path.parent.mkdir(parents=True, exist_ok=True)
+    # The version is the pickle's checksum; a new ARTIFACT_FORMAT can still
+    # change the compact export of the same model, so compare contents.
+    for path, payload in ((compact_path, compact), (version_path, data)):
+        if not path.exists() or path.read_bytes() != payload:
+            atomic_write_bytes(path, payload)
+    os.utime(version_path.parent)  # mark as most recently published for pruning
+
+    manifest = {
+        "version": version,
+        "sha256": checksum,
+        "path": str(version_path.relative_to(model_dir)),
+        "compact_path": str(compact_path.relative_to(model_dir)),
+        "compact_sha256": hashlib.sha256(compact).hexdigest(),
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "sklearn_version": sklearn.__version__,
+        "estimator": type(model).__name__,
+        "feature_names": list(feature_names),
+        "target_names": list(target_names),
+        **(metadata or {}),
+    }
+    atomic_write_bytes(model_dir / MANIFEST_NAME, json.dumps(manifest, indent=2).encode())
+    atomic_write_bytes(model_dir / COMPACT_NAME, compact)
+    atomic_write_bytes(model_dir / MODEL_NAME, data)
+    prune_versions(model_dir, KEEP_VERSIONS, keep=version)
+    return manifest
+
+
+def prune_versions(model_dir: Path, limit: int, keep: str):
+    """Delete all but the ``limit`` most recently published versions.
+
+    Inference only reads the top-level artifacts, so old version directories
+    can be removed at any time; ``keep`` (the version just published) never is.
+    """
+    versions_dir = model_dir / "versions"
+    if limit <= 0 or not versions_dir.is_dir():
+        return
+    entries = sorted(
+        (entry for entry in versions_dir.iterdir() if entry.is_dir() and entry.name != keep),
+        key=lambda entry: entry.stat().st_mtime,
+        reverse=True,
+    )
+    for entry in entries[max(limit - 1, 0):]:
+        shutil.rmtree(entry, ignore_errors=True)
+
+
+def data_digest(X, y) -> str:
+    digest = hashlib.sha256()
+    for array in (X, y):
+        array = np.ascontiguousarray(array)
+        digest.update(f"{array.dtype.str}{array.shape}".encode())
+        digest.update(array.tobytes())
+    return digest.hexdigest()
+
+
+def file_digest(path: Path, block_size=1 << 20) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def training_fingerprint(data_key: str, config: dict) -> str:
+    """Hash of the training data, the training configuration, the artifact
+    format and library versions.
+
+    Two runs with the same fingerprint produce the same model, so the second
+    one can be skipped.
+    """
+    payload = {
+        "data": data_key,
+        "config": config,
+        "artifact_format": ARTIFACT_FORMAT,
+        "versions": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "scikit-learn": sklearn.__version__,
+            "joblib": joblib.__version__,
+        },
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def published_manifest(model_dir: Path, fingerprint: str):
+    """Return the current manifest if it was trained with ``fingerprint`` and its
+    artifacts are intact on disk, else ``None``."""
+    try:
+        manifest = json.loads((model_dir / MANIFEST_NAME).read_text())
+    except (OSError, ValueError):
+        return None
+    if manifest.get("fingerprint") != fingerprint:
+        return None
+    for name, key in ((MODEL_NAME, "sha256"), (COMPACT_NAME, "compact_sha256")):
+        try:
+            checksum = hashlib.sha256((model_dir / name).read_bytes()).hexdigest()
+        except OSError:
+            return None
+        if checksum != manifest.get(key):
+            return None
+    return manifest
+
+
+def grid_candidates():
+    candidates = []
+    for kernel, grid in SEARCH_GRID.items():
+        names = sorted(grid)
+        for values in itertools.product(*(grid[name] for name in names)):
+            candidates.append({"kernel": kernel, **dict(zip(names, values))})
+    return candidates
+
+
+def random_candidates(n_iter: int, seed: int):
+    """Log-uniform samples of C (and gamma for the RBF kernel)."""
+    rng = np.random.default_rng(seed)
+    candidates = []
+    for _ in range(n_iter):
+        kernel = str(rng.choice(sorted(SEARCH_GRID)))
+        params = {"kernel": kernel, "C": float(10 ** rng.uniform(-2, 3))}
+        if kernel == "rbf":
+            params["gamma"] = float(10 ** rng.uniform(-4, 1))
+        candidates.append(params)
+    return candidates
+
+
+def score_fold(params, fold, n_splits, seed, data_key, X, y):
+    """Accuracy of ``SVC(**params)`` on one stratified CV fold.
+
+    Cached on disk by :func:`search`; ``data_key`` stands in for ``X`` and
+    ``y`` in the cache key so large arrays are not re-hashed on every call.
+    """
+    splitter = StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=seed)
+    train_idx, test_idx = list(splitter.split(X, y))[fold]
+    model = SVC(**params).fit(X[train_idx], y[train_idx])
+    return float(model.score(X[test_idx], y[test_idx]))
+
+
+def search(X, y, candidates, cache_dir: Path, n_splits=5, seed=42, n_jobs=-1):
+    """Cross-validate every candidate in parallel and refit the best one on all data.
+
+    Fold scores are memoized in ``cache_dir`` (keyed on the parameters, the
+    fold setup and a hash of the data), so re-running the search only
+    evaluates configurations it has not seen before.
+    """
+    started = time.perf_counter()
+    data_key = data_digest(X, y)
+    memory = joblib.Memory(cache_dir, verbose=0)
+    cached_score = memory.cache(score_fold, ignore=["X", "y"])
+
+    jobs = [
+        (params, fold, n_splits, seed, data_key, X, y)
+        for params in candidates
+        for fold in range(n_splits)
+    ]
+    cache_hits = sum(cached_score.check_call_in_cache(*job) for job in jobs)
+    scores = joblib.Parallel(n_jobs=n_jobs)(joblib.delayed(cached_score)(*job) for job in jobs)
+
+    results = []
+    for i, params in enumerate(candidates):
+        fold_scores = scores[i * n_splits:(i + 1) * n_splits]
+        results.append({
+            "params": params,
+            "mean_score": float(np.mean(fold_scores)),
+            "std_score": float(np.std(fold_scores)),
+            "fold_scores": fold_scores,
+        })
+    results.sort(key=lambda result: result["mean_score"], reverse=True)
+
+    best_params = results[0]["params"]
+    model = SVC(**best_params).fit(X, y)
+    report = {
+        "best_params": best_params,
+        "best_score": results[0]["mean_score"],
+        "n_candidates": len(candidates),
+        "n_splits": n_splits,
+        "fold_evaluations": len(jobs),
+        "cached_fold_evaluations": cache_hits,
+        "elapsed_s": round(time.perf_counter() - started, 3),
+        "results": results,
+    }
+    return model, report
+
+
+def iter_csv_chunks(csv_path: Path, label_column, feature_columns, chunk_size):
+    """Yield ``(X, labels)`` chunks of a CSV without ever loading the whole file."""
+    reader = pd.read_csv(
+        csv_path,
+        usecols=[*feature_columns, label_column],
+        dtype={column: np.float32 for column in feature_columns},
+        chunksize=chunk_size,
+    )
+    for chunk in reader:
+        yield chunk[feature_columns].to_numpy(), chunk[label_column].to_numpy()
+
+
+def encode_labels(labels: np.ndarray, classes) -> np.ndarray:
+    """Map labels to class indices; integer labels are taken as indices already."""
+    if np.issubdtype(labels.dtype, np.integer):
+        return labels.astype(int)
+    lookup = {name: index for index, name in enumerate(classes)}
+    try:
+        return np.array([lookup[label] for label in labels], dtype=int)
+    except KeyError as exc:
+        raise ValueError(f"Unknown class label {exc.args[0]!r}; expected one of {classes}.")
+
+
+def stream_train(csv_path: Path, label_column, feature_columns, classes,
+                 chunk_size=100_000, epochs=5, seed=42):
+    """Fit a linear SVM with ``partial_fit`` one CSV chunk at a time.
+
+    Memory stays bounded by ``chunk_size`` rows. A first pass learns feature
+    means and variances, then each epoch re-reads the file and takes one SGD
+    step per (shuffled) chunk. The scaling is folded into the weights at the
+    end, so the result is a plain ``SGDClassifier`` on raw features that the
+    inference server can load like any other model.
+    """
+    scaler = StandardScaler()
+    n_rows = 0
+    for X, _ in iter_csv_chunks(csv_path, label_column, feature_columns, chunk_size):
+        scaler.partial_fit(X)
+        n_rows += len(X)
+
+    rng = np.random.default_rng(seed)
+    model = SGDClassifier(loss="hinge", alpha=1e-4, random_state=seed)
+    all_classes = np.arange(len(classes))
+    for _ in range(epochs):
+        for X, labels in iter_csv_chunks(csv_path, label_column, feature_columns, chunk_size):
+            order = rng.permutation(len(X))
+            y = encode_labels(labels, classes)
+            model.partial_fit(scaler.transform(X[order]), y[order], classes=all_classes)
+
+    # w . (x - mean) / scale + b  ==  (w / scale) . x + (b - (w / scale) . mean)
+    coef = model.coef_ / scaler.scale_
+    model.intercept_ = model.intercept_ - coef @ scaler.mean_
+    model.coef_ = coef
+    return model, n_rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Train the iris SVC and publish it.")
+    parser.add_argument(
+        "--mode", choices=["fit", "search", "stream"], default=os.environ.get("TRAIN_MODE", "fit"),
+        help="fit: default SVC; search: cross-validated hyperparameter search; "
+             "stream: out-of-core linear SVM over --csv",
+    )
+    parser.add_argument("--search", choices=["grid", "random"], default="grid")
+    parser.add_argument("--n-iter", type=int, default=30, help="random search candidates")
+    parser.add_argument("--cv", type=int, default=5, help="cross-validation folds")
+    parser.add_argument("--n-jobs", type=int, default=-1, help="parallel workers (-1: all cores)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--csv", type=Path, default=os.environ.get("TRAIN_CSV"),
+                        help="training CSV for --mode stream")
+    parser.add_argument("--label-column", default="species")
+    parser.add_argument("--feature-columns", nargs="+",
+                        help="default: every column except the label")
+    parser.add_argument("--classes", nargs="+",
+                        help="class names in index order (default: the iris species)")
+    parser.add_argument("--chunk-size", type=int, default=100_000, help="rows per CSV chunk")
+    parser.add_argument("--epochs", type=int, default=5, help="passes over the CSV")
+    parser.add_argument(
+        "--force", action="store_true", default=os.environ.get("TRAIN_FORCE") == "1",
+        help="retrain even if a model with the same fingerprint is published",
+    )
+    args = parser.parse_args(argv)
+
+    MODEL_DIR.mkdir(parents=True, exist_ok=True)
+    if args.mode == "stream":
+        stream(args)
+        return
+
+    # Load the Iris dataset
+    iris = datasets.load_iris()
+
+    if args.mode == "search":
+        candidates = (
+            grid_candidates() if args.search == "grid"
+            else random_candidates(args.n_iter, args.seed)
+        )
+        config = {"mode": "search", "candidates": candidates, "cv": args.cv, "seed": args.seed}
+    else:
+        config = {"mode": "fit", "estimator": "SVC", "params": SVC().get_params()}
+
+    fingerprint = training_fingerprint(data_digest(iris.data, iris.target), config)
+    if not args.force and skip_if_published(fingerprint):
+        return
+
+    metadata = {"fingerprint": fingerprint}
+    if args.mode == "search":
+        model, report = search(
+            iris.data, iris.target, candidates, MODEL_DIR / ".search_cache",
+            n_splits=args.cv, seed=args.seed, n_jobs=args.n_jobs,
+        )
+        atomic_write_bytes(MODEL_DIR / SEARCH_REPORT_NAME, json.dumps(report, indent=2).encode())
+        metadata.update(params=report["best_params"], cv_score=report["best_score"])
+        print(
+            f"Searched {report['n_candidates']} candidates "
+            f"({report['cached_fold_evaluations']}/{report['fold_evaluations']} folds cached): "
+            f"best {report['best_params']} with CV accuracy {report['best_score']:.3f}"
+        )
+    else:
+        # Create and train an SVM classifier on the iris dataset
+        model = SVC().fit(iris.data, iris.target)
+
+    # Save the trained model to the shared volume
+    manifest = publish_model(
+        model, MODEL_DIR, iris.feature_names, iris.target_names.tolist(), metadata
+    )
+    report_published(manifest)
+
+
+def skip_if_published(fingerprint: str) -> bool:
+    manifest = published_manifest(MODEL_DIR, fingerprint)
+    if manifest is None:
+        return False
+    print(
+        f"Model {manifest['version']} in {MODEL_DIR} already matches this data and "
+        f"configuration; skipping training (use --force to retrain)"
+    )
+    return True
+
+
+def report_published(manifest: dict):
+    print(
+        f"Model training complete and saved as {MODEL_DIR / MODEL_NAME} "
+        f"(version {manifest['version']})"
+    )
+
+
+def stream(args):
+    """``--mode stream``: out-of-core training on a CSV from the shared volume."""
+    if args.csv is None:
+        raise SystemExit("--mode stream needs --csv (or TRAIN_CSV).")
+    classes = args.classes or datasets.load_iris().target_names.tolist()
+    feature_columns = args.feature_columns or [
+        column for column in pd.read_csv(args.csv, nrows=0).columns
+        if column != args.label_column
+    ]
+    config = {
+        "mode": "stream", "estimator": "SGDClassifier", "label_column": args.label_column,
+        "feature_columns": feature_columns, "classes": classes,
+        "chunk_size": args.chunk_size, "epochs": args.epochs, "seed": args.seed,
+    }
+    fingerprint = training_fingerprint(file_digest(args.csv), config)
+    if not args.force and skip_if_published(fingerprint):
+        return
+
+    model, n_rows = stream_train(
+        args.csv, args.label_column, feature_columns, classes,
+        chunk_size=args.chunk_size, epochs=args.epochs, seed=args.seed,
+    )
+    manifest = publish_model(
+        model, MODEL_DIR, feature_columns, classes,
+        {"fingerprint": fingerprint, "training_rows": n_rows},
+    )
+    report_published(manifest)
+
+
+if __name__ == "__main__":
+    main()
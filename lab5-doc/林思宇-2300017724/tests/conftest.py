@@ -0,0 +1,27 @@
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+# The inference and training code are flat scripts, not packages; import them
+# the same way their containers do, from their own directories.
+ROOT = Path(__file__).resolve().parent.parent
+sys.path[:0] = [str(ROOT / "docker" / "inference"), str(ROOT / "docker" / "training")]
+
+
+class FakeClock:
+    """Stand-in for ``time.monotonic`` that only moves when a test says so."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(time, "monotonic", fake)
+    return fake
@@ -0,0 +1,101 @@
+import pytest
+
+from admission import AdmissionController
+
+
+def test_everything_admitted_when_unlimited():
+    controller = AdmissionController()
+    for _ in range(100):
+        assert controller.admit("client") is None
+    assert controller.stats()["admitted"] == 100
+
+
+def test_in_flight_limit_and_release():
+    controller = AdmissionController(max_in_flight=2)
+    assert controller.admit("a") is None
+    assert controller.admit("b") is None
+    assert controller.admit("c") == (503, 1.0)
+    controller.release()
+    assert controller.admit("c") is None
+    stats = controller.stats()
+    assert (stats["in_flight"], stats["rejected_overload"]) == (2, 1)
+
+
+def test_token_bucket_burst_then_refill(clock):
+    controller = AdmissionController(rate=2.0, burst=3)
+    for _ in range(3):
+        assert controller.admit("a") is None
+        controller.release()
+    status, retry_after = controller.admit("a")
+    assert status == 429
+    assert retry_after == pytest.approx(0.5)
+    # Other clients have their own bucket
+    assert controller.admit("b") is None
+    controller.release()
+
+    clock.now += 0.5
+    assert controller.admit("a") is None
+    controller.release()
+    assert controller.admit("a")[0] == 429
+    # Idle time refills up to the burst, never beyond it
+    clock.now += 60
+    for _ in range(3):
+        assert controller.admit("a") is None
+        controller.release()
+    assert controller.admit("a")[0] == 429
+    assert controller.stats()["rejected_rate_limited"] == 3
+
+
+def test_default_burst_is_the_rate():
+    assert AdmissionController(rate=5.0).burst == 5.0
+    assert AdmissionController(rate=0.5).burst == 1.0
+
+
+def test_least_recently_seen_clients_are_dropped(clock):
+    controller = AdmissionController(rate=1.0, burst=1, max_clients=2)
+    assert controller.admit("a") is None
+    assert controller.admit("b") is None
+    assert controller.admit("a")[0] == 429  # a is now more recent than b
+    assert controller.admit("c") is None  # evicts b
+    assert controller.stats()["clients_tracked"] == 2
+    assert controller.admit("b") is None  # a fresh bucket
+
+
+def test_queue_limit_uses_the_probe():
+    controller = AdmissionController(max_queue=2)
+    depth = [0]
+    controller.queue_probe = lambda: depth[0]
+    assert controller.admit("a") is None
+    depth[0] = 2
+    assert controller.admit("a") == (503, 1.0)
+    stats = controller.stats()
+    assert (stats["queue_depth"], stats["rejected_queue_full"]) == (2, 1)
+
+
+def test_queue_depth_without_probe_is_zero():
+    controller = AdmissionController(max_queue=1)
+    assert controller.queue_depth() == 0
+    assert controller.admit("a") is None
+
+
+def test_shed_requests_do_not_spend_tokens(clock):
+    controller = AdmissionController(max_in_flight=1, rate=1.0, burst=2)
+    assert controller.admit("busy") is None
+    for _ in range(10):
+        assert controller.admit("a") == (503, 1.0)
+    controller.release()
+    # Both of a's tokens are still there once the server has room again
+    assert controller.admit("a") is None
+    controller.release()
+    assert controller.admit("a") is None
+    controller.release()
+    assert controller.admit("a")[0] == 429
+
+
+def test_full_queue_does_not_spend_tokens(clock):
+    controller = AdmissionController(rate=1.0, burst=1, max_queue=1)
+    depth = [1]
+    controller.queue_probe = lambda: depth[0]
+    assert controller.admit("a") == (503, 1.0)
+    depth[0] = 0
+    assert controller.admit("a") is None
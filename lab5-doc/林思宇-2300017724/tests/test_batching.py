@@ -0,0 +1,64 @@
+from concurrent.futures import ThreadPoolExecutor
+import threading
+
+import numpy as np
+import pytest
+
+from batching import MicroBatcher
+
+
+def test_results_go_back_to_their_callers():
+    batch_sizes = []
+
+    def predict(matrix):
+        batch_sizes.append(len(matrix))
+        return matrix[:, 0].astype(int) * 10
+
+    # A long wait so concurrent submissions really end up in shared batches
+    batcher = MicroBatcher(predict, max_batch_size=8, max_wait_us=50_000)
+    with ThreadPoolExecutor(max_workers=32) as pool:
+        results = list(pool.map(lambda i: batcher.predict(np.array([i, -i]), timeout=5),
+                                range(100)))
+    assert results == [i * 10 for i in range(100)]
+    assert sum(batch_sizes) == 100
+    assert max(batch_sizes) <= 8
+    assert len(batch_sizes) < 100
+
+
+def test_batch_is_cut_at_max_batch_size():
+    release = threading.Event()
+    batch_sizes = []
+
+    def predict(matrix):
+        release.wait(5)
+        batch_sizes.append(len(matrix))
+        return np.zeros(len(matrix), dtype=int)
+
+    batcher = MicroBatcher(predict, max_batch_size=3, max_wait_us=1_000_000)
+    futures = [batcher.submit(np.array([float(i)])) for i in range(7)]
+    release.set()
+    assert [future.result(timeout=5) for future in futures] == [0] * 7
+    assert sum(batch_sizes) == 7
+    assert max(batch_sizes) == 3
+
+
+def test_prediction_error_reaches_every_caller_and_worker_survives():
+    calls = []
+
+    def predict(matrix):
+        calls.append(len(matrix))
+        if len(calls) == 1:
+            raise RuntimeError("model exploded")
+        return np.ones(len(matrix), dtype=int)
+
+    batcher = MicroBatcher(predict, max_batch_size=4, max_wait_us=100_000)
+    failing = [batcher.submit(np.array([1.0])) for _ in range(3)]
+    for future in failing:
+        with pytest.raises(RuntimeError, match="model exploded"):
+            future.result(timeout=5)
+    assert batcher.predict(np.array([1.0]), timeout=5) == 1
+
+
+def test_rejects_empty_batch_size():
+    with pytest.raises(ValueError):
+        MicroBatcher(lambda matrix: matrix, max_batch_size=0)
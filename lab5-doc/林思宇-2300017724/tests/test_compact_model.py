@@ -0,0 +1,105 @@
+import numpy as np
+import pytest
+from sklearn import datasets
+from sklearn.linear_model import SGDClassifier
+from sklearn.preprocessing import StandardScaler
+from sklearn.svm import SVC
+
+from compact_model import CompactSVC, load_arrays
+from train import export_compact
+
+
+@pytest.fixture(scope="module")
+def iris():
+    X, y = datasets.load_iris(return_X_y=True)
+    return StandardScaler().fit_transform(X), y
+
+
+@pytest.fixture
+def probe(iris):
+    # Training rows plus points off the data manifold, where ties and signs matter
+    X, _ = iris
+    rng = np.random.default_rng(0)
+    return np.vstack([X, rng.normal(scale=3.0, size=(500, X.shape[1]))])
+
+
+def export_and_load(model, tmp_path, mmap_mode=None, target_names=None):
+    path = tmp_path / "model.npz"
+    path.write_bytes(export_compact(model, target_names))
+    return CompactSVC.load(path, mmap_mode=mmap_mode)
+
+
+@pytest.mark.parametrize("params", [
+    {"kernel": "rbf", "gamma": "scale", "C": 1.0},
+    {"kernel": "rbf", "gamma": 1.0, "C": 100.0},
+    {"kernel": "linear", "C": 0.1},
+])
+def test_multiclass_svc_parity(iris, probe, tmp_path, params):
+    model = SVC(**params).fit(*iris)
+    compact = export_and_load(model, tmp_path)
+    np.testing.assert_array_equal(compact.predict(probe), model.predict(probe))
+    # libsvm's one-vs-one decision values, before sklearn's ovr aggregation
+    np.testing.assert_allclose(
+        compact.decision_function(probe),
+        SVC(**params, decision_function_shape="ovo").fit(*iris).decision_function(probe),
+        rtol=1e-7, atol=1e-9,
+    )
+
+
+@pytest.mark.parametrize("kernel", ["rbf", "linear"])
+def test_binary_svc_sign_is_undone(iris, probe, tmp_path, kernel):
+    X, y = iris
+    mask = y > 0  # versicolor vs virginica overlap, so both classes win somewhere
+    model = SVC(kernel=kernel).fit(X[mask], y[mask])
+    compact = export_and_load(model, tmp_path)
+    predicted = model.predict(probe)
+    assert set(predicted) == {1, 2}
+    np.testing.assert_array_equal(compact.predict(probe), predicted)
+    # sklearn reports -decision for binary problems; the export stores libsvm's sign
+    np.testing.assert_allclose(compact.decision_function(probe)[:, 0],
+                               -model.decision_function(probe), rtol=1e-7, atol=1e-9)
+
+
+@pytest.mark.parametrize("binary", [False, True])
+def test_sgd_classifier_parity(iris, probe, tmp_path, binary):
+    X, y = iris
+    if binary:
+        X, y = X[y > 0], y[y > 0]
+    model = SGDClassifier(random_state=0).fit(X, y)
+    compact = export_and_load(model, tmp_path)
+    assert compact.kernel == "linear"
+    np.testing.assert_array_equal(compact.predict(probe), model.predict(probe))
+
+
+def test_mmap_load_matches_eager_load(iris, probe, tmp_path):
+    model = SVC().fit(*iris)
+    eager = export_and_load(model, tmp_path)
+    mapped = export_and_load(model, tmp_path, mmap_mode="r")
+    # Still a view of the read-only mapping, not a private copy
+    assert isinstance(mapped.support_vectors.base, np.memmap)
+    assert not mapped.support_vectors.flags.writeable
+    np.testing.assert_array_equal(mapped.predict(probe), eager.predict(probe))
+    np.testing.assert_array_equal(mapped.predict(probe), model.predict(probe))
+
+
+def test_load_arrays_handles_scalars_and_compressed_members(tmp_path):
+    path = tmp_path / "arrays.npz"
+    np.savez_compressed(path, matrix=np.arange(6.0).reshape(2, 3), gamma=np.array(0.5))
+    arrays = load_arrays(path, mmap_mode="r")
+    np.testing.assert_array_equal(arrays["matrix"], np.arange(6.0).reshape(2, 3))
+    assert float(arrays["gamma"]) == 0.5
+
+
+def test_target_names_round_trip(iris, tmp_path):
+    model = SVC().fit(*iris)
+    names = ["setosa", "versicolor", "virginica"]
+    compact = export_and_load(model, tmp_path, mmap_mode="r", target_names=names)
+    assert compact.target_names.tolist() == names
+    assert export_and_load(model, tmp_path).target_names is None
+
+
+def test_unsupported_kernel_is_rejected(iris):
+    model = SVC(kernel="poly").fit(*iris)
+    with pytest.raises(ValueError):
+        CompactSVC(model.support_vectors_, model.dual_coef_, model.intercept_,
+                   model.n_support_, model.classes_, kernel="poly")
@@ -0,0 +1,65 @@
+import json
+
+import numpy as np
+import pytest
+
+import train
+from train import (
+    COMPACT_NAME,
+    MANIFEST_NAME,
+    MODEL_NAME,
+    data_digest,
+    published_manifest,
+    training_fingerprint,
+)
+
+
+@pytest.fixture
+def model_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(train, "MODEL_DIR", tmp_path)
+    return tmp_path
+
+
+def test_fingerprint_covers_data_config_and_artifact_format(monkeypatch):
+    X, y = np.arange(8.0).reshape(4, 2), np.array([0, 1, 0, 1])
+    base = training_fingerprint(data_digest(X, y), {"C": 1.0})
+    assert training_fingerprint(data_digest(X, y), {"C": 1.0}) == base
+    assert training_fingerprint(data_digest(X, y), {"C": 2.0}) != base
+    assert training_fingerprint(data_digest(X + 1, y), {"C": 1.0}) != base
+    assert training_fingerprint(data_digest(X.astype(np.float32), y), {"C": 1.0}) != base
+    monkeypatch.setattr(train, "ARTIFACT_FORMAT", train.ARTIFACT_FORMAT + 1)
+    assert training_fingerprint(data_digest(X, y), {"C": 1.0}) != base
+
+
+def test_second_run_is_skipped(model_dir, capsys):
+    train.main([])
+    manifest = json.loads((model_dir / MANIFEST_NAME).read_text())
+    capsys.readouterr()
+
+    train.main([])
+    assert "skipping training" in capsys.readouterr().out
+    assert json.loads((model_dir / MANIFEST_NAME).read_text()) == manifest
+    assert published_manifest(model_dir, manifest["fingerprint"]) == manifest
+
+    train.main(["--force"])
+    assert json.loads((model_dir / MANIFEST_NAME).read_text())["created_at"] != manifest["created_at"]
+
+
+@pytest.mark.parametrize("name", [MODEL_NAME, COMPACT_NAME])
+def test_damaged_or_missing_artifacts_are_retrained(model_dir, name):
+    train.main([])
+    fingerprint = json.loads((model_dir / MANIFEST_NAME).read_text())["fingerprint"]
+    assert published_manifest(model_dir, "something else") is None
+
+    (model_dir / name).write_bytes(b"truncated")
+    assert published_manifest(model_dir, fingerprint) is None
+    (model_dir / name).unlink()
+    assert published_manifest(model_dir, fingerprint) is None
+
+    train.main([])
+    assert published_manifest(model_dir, fingerprint) is not None
+
+
+def test_unreadable_manifest_is_not_a_match(model_dir):
+    (model_dir / MANIFEST_NAME).write_text("{not json")
+    assert published_manifest(model_dir, "anything") is None
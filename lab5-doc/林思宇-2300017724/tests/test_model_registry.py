@@ -0,0 +1,142 @@
+import threading
+
+import numpy as np
+import pytest
+
+from model_registry import ModelRegistry
+from model_store import ModelStore
+
+
+def load_zeros(path, mmap_mode=None):
+    """A "model" whose size in bytes is the number written in its file."""
+    return np.zeros(int(path.read_text()), dtype=np.uint8)
+
+
+@pytest.fixture
+def model_dir(tmp_path):
+    for name, nbytes in (("a", 400), ("b", 400), ("c", 400)):
+        (tmp_path / f"{name}.bin").write_text(str(nbytes))
+    return tmp_path
+
+
+def registry(model_dir, **kwargs):
+    return ModelRegistry(model_dir, {".bin": load_zeros}, preferred_suffix=".bin", **kwargs)
+
+
+def loaded_names(models):
+    return [entry["name"] for entry in models.describe()["models"] if entry["loaded"]]
+
+
+def test_models_load_on_first_request(model_dir):
+    models = registry(model_dir)
+    assert loaded_names(models) == []
+    assert len(models.get("a").model) == 400
+    assert loaded_names(models) == ["a"]
+    assert models.get("missing") is None
+
+
+def test_least_recently_used_model_is_evicted(model_dir):
+    models = registry(model_dir, max_bytes=1000)
+    models.get("a")
+    models.get("b")
+    models.get("a")  # b is now the least recently used
+    models.get("c")
+    assert loaded_names(models) == ["a", "c"]
+    assert models.describe()["evictions"] == 1
+    assert models.describe()["loaded_bytes"] == 800
+    # An evicted model is simply loaded again
+    assert len(models.get("b").model) == 400
+    assert loaded_names(models) == ["b", "c"]
+
+
+def test_a_model_larger_than_the_budget_is_still_served(model_dir):
+    (model_dir / "big.bin").write_text("5000")
+    models = registry(model_dir, max_bytes=1000)
+    models.get("a")
+    assert len(models.get("big").model) == 5000
+    assert loaded_names(models) == ["big"]
+
+
+def test_changed_file_is_reloaded(model_dir):
+    models = registry(model_dir)
+    first = models.get("a")
+    (model_dir / "a.bin").write_text("800")
+    second = models.get("a")
+    assert second is not first
+    assert len(second.model) == 800
+    assert models.describe()["loaded_bytes"] == 800
+
+
+def test_preferred_suffix_wins(model_dir):
+    (model_dir / "a.txt").write_text("ignored")
+    loaders = {".bin": load_zeros, ".txt": lambda path, mmap_mode=None: "txt"}
+    models = ModelRegistry(model_dir, loaders, preferred_suffix=".txt")
+    assert models.get("a").model == "txt"
+    assert len(models.get("b").model) == 400
+
+
+def test_pinned_stores_are_shared_and_never_evicted(model_dir):
+    pinned = ModelStore(model_dir / "a.bin", loader=load_zeros)
+    models = registry(model_dir, max_bytes=100, pinned={"a": pinned})
+    assert models.get("a") is None  # the pinned store loads on its own schedule
+    pinned.load()
+    assert models.get("a") is pinned.current
+    models.get("b")
+    models.get("c")
+    assert models.get("a") is pinned.current
+    assert {entry["name"]: entry["pinned"] for entry in models.describe()["models"]}["a"]
+
+
+def test_deleted_model_is_dropped(model_dir):
+    models = registry(model_dir)
+    models.get("a")
+    (model_dir / "a.bin").unlink()
+    assert models.get("a") is None
+    assert loaded_names(models) == []
+    assert models.describe()["loaded_bytes"] == 0
+
+
+def test_deleted_artifact_falls_back_to_the_other_suffix(model_dir):
+    (model_dir / "a.txt").write_text("txt")
+    loaders = {".bin": load_zeros, ".txt": lambda path, mmap_mode=None: "txt"}
+    models = ModelRegistry(model_dir, loaders, preferred_suffix=".txt")
+    assert models.get("a").model == "txt"
+    (model_dir / "a.txt").unlink()
+    assert len(models.get("a").model) == 400
+
+
+def test_unknown_names_share_one_listing(model_dir, monkeypatch):
+    models = registry(model_dir, discovery_ttl=60)
+    calls = []
+    discover = models.discover
+    monkeypatch.setattr(models, "discover", lambda: calls.append(1) or discover())
+    for _ in range(50):
+        assert models.get("missing") is None
+    assert len(calls) == 1
+
+
+def test_listing_does_not_block_known_models(model_dir, monkeypatch):
+    models = registry(model_dir, discovery_ttl=0)
+    models.get("a")
+    listing, release = threading.Event(), threading.Event()
+    discover = models.discover
+
+    def slow_discover():
+        listing.set()
+        release.wait(5)
+        return discover()
+
+    monkeypatch.setattr(models, "discover", slow_discover)
+    lookup = threading.Thread(target=models.get, args=("missing",))
+    lookup.start()
+    try:
+        assert listing.wait(5)
+        # The unknown name is still being looked up; "a" is served meanwhile
+        served = []
+        known = threading.Thread(target=lambda: served.append(models.get("a")))
+        known.start()
+        known.join(1)
+        assert served and len(served[0].model) == 400
+    finally:
+        release.set()
+        lookup.join()
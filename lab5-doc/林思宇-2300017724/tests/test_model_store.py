@@ -0,0 +1,115 @@
+import hashlib
+import json
+
+import pytest
+
+import model_store
+from model_store import ModelStore
+
+
+class StopWatching(Exception):
+    pass
+
+
+def read_text_model(path, mmap_mode=None):
+    text = path.read_text()
+    if text == "corrupt":
+        raise ValueError("unreadable model")
+    return text
+
+
+@pytest.fixture
+def store(tmp_path):
+    path = tmp_path / "model.txt"
+    path.write_text("v1")
+    store = ModelStore(path, loader=read_text_model)
+    store.load()
+    return store
+
+
+def run_watcher(store, monkeypatch, steps):
+    """Run the watch loop synchronously; each poll first runs the next step."""
+    steps = list(steps)
+
+    def fake_sleep(interval):
+        if not steps:
+            raise StopWatching
+        steps.pop(0)()
+
+    monkeypatch.setattr(model_store.time, "sleep", fake_sleep)
+    with pytest.raises(StopWatching):
+        store._watch(0.01)
+
+
+def test_load_names_the_version_after_the_manifest(tmp_path):
+    path = tmp_path / "model.txt"
+    path.write_text("v1")
+    digest = hashlib.sha256(b"v1").hexdigest()
+    (tmp_path / "latest.json").write_text(json.dumps({
+        "version": "abc123", "compact_sha256": digest, "target_names": ["x", "y"],
+    }))
+    loaded = ModelStore(path, loader=read_text_model).load()
+    assert loaded.version == "abc123"
+    assert loaded.target_names.tolist() == ["x", "y"]
+    # A manifest for some other file is ignored
+    path.write_text("v2")
+    loaded = ModelStore(path, loader=read_text_model).load()
+    assert loaded.version == hashlib.sha256(b"v2").hexdigest()[:12]
+    assert loaded.manifest is None
+
+
+def test_same_content_is_not_loaded_again(store):
+    first = store.current
+    store.path.write_text("v1")  # new mtime, same bytes
+    assert store.is_stale()
+    assert store.load() is first
+    assert not store.is_stale()
+    assert store.reloads == 0
+
+
+def test_reload_waits_for_the_file_to_settle(store, monkeypatch):
+    def write(text):
+        return lambda: store.path.write_text(text)
+
+    def expect(text):
+        def check():
+            assert store.current.model == text
+        return check
+
+    run_watcher(store, monkeypatch, [
+        write("v2-partial"),  # first sighting: remember the signature
+        write("v2"),  # changed again before the next poll: keep waiting
+        expect("v1"),  # unchanged since the last poll: load it now
+        expect("v2"),
+    ])
+    assert store.reloads == 1
+
+
+def test_failed_reload_keeps_the_model_and_is_not_retried(store, monkeypatch):
+    calls = []
+
+    def counting_loader(path, mmap_mode=None):
+        calls.append(path.read_text())
+        return read_text_model(path)
+
+    store.loader = counting_loader
+    run_watcher(store, monkeypatch, [
+        lambda: store.path.write_text("corrupt"),
+        lambda: None,  # settled: the load fails
+        lambda: None,  # same file: not tried again
+        lambda: store.path.write_text("v3"),
+        lambda: None,
+    ])
+    assert calls == ["corrupt", "v3"]
+    assert store.current.model == "v3"
+
+
+def test_missing_file_keeps_serving(store, monkeypatch):
+    run_watcher(store, monkeypatch, [store.path.unlink, lambda: None])
+    assert store.current.model == "v1"
+
+
+def test_unload_makes_the_store_stale(store):
+    store.unload()
+    assert store.current is None
+    assert store.is_stale()
@@ -0,0 +1,82 @@
+import numpy as np
+import pytest
+
+from prediction_cache import PredictionCache
+
+
+def test_key_quantizes_float_noise_and_negative_zero():
+    cache = PredictionCache(decimals=4)
+    assert cache.key([5.1, 3.5, 0.0]) == cache.key([5.100001, 3.49999, -0.0])
+    assert cache.key([5.1, 3.5, 0.0]) != cache.key([5.1, 3.6, 0.0])
+
+
+def test_hit_and_miss_counts():
+    cache = PredictionCache()
+    key = cache.key(np.array([1.0, 2.0]))
+    assert cache.get("v1", key) is None
+    cache.put("v1", key, 2)
+    assert cache.get("v1", key) == 2
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 1, 1)
+
+
+def test_lru_eviction_by_entry_count():
+    cache = PredictionCache(max_entries=2)
+    a, b, c = (cache.key([value]) for value in (1.0, 2.0, 3.0))
+    cache.put("v1", a, 0)
+    cache.put("v1", b, 1)
+    cache.get("v1", a)  # a is now the most recently used
+    cache.put("v1", c, 2)
+    assert cache.get("v1", b) is None
+    assert cache.get("v1", a) == 0
+    assert cache.get("v1", c) == 2
+    assert cache.stats()["evictions"] == 1
+
+
+def test_eviction_by_bytes():
+    probe = PredictionCache()
+    probe.put("v1", probe.key([0.0]), 0)
+    entry_bytes = probe.stats()["bytes"]
+
+    cache = PredictionCache(max_entries=0, max_bytes=2 * entry_bytes)
+    keys = [cache.key([float(value)]) for value in range(5)]
+    for index, key in enumerate(keys):
+        cache.put("v1", key, index)
+    stats = cache.stats()
+    assert stats["entries"] == 2
+    assert stats["bytes"] <= 2 * entry_bytes
+    assert stats["evictions"] == 3
+    assert [cache.get("v1", key) for key in keys[-2:]] == [3, 4]
+
+
+def test_overwrite_does_not_double_count_bytes():
+    cache = PredictionCache()
+    key = cache.key([1.0])
+    cache.put("v1", key, 0)
+    entry_bytes = cache.stats()["bytes"]
+    cache.put("v1", key, 1)
+    assert cache.stats()["bytes"] == entry_bytes
+    assert cache.get("v1", key) == 1
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = PredictionCache(ttl=10.0)
+    key = cache.key([1.0])
+    cache.put("v1", key, 0)
+    clock.now += 9.0
+    assert cache.get("v1", key) == 0
+    clock.now += 2.0
+    assert cache.get("v1", key) is None
+    stats = cache.stats()
+    assert (stats["expirations"], stats["entries"], stats["bytes"]) == (1, 0, 0)
+
+
+def test_new_model_version_drops_everything():
+    cache = PredictionCache()
+    key = cache.key([1.0])
+    cache.put("v1", key, 0)
+    assert cache.get("v2", key) is None
+    assert cache.stats()["version"] == "v2"
+    assert cache.stats()["entries"] == 0
+    # Going back does not resurrect the old entries either
+    assert cache.get("v1", key) is None
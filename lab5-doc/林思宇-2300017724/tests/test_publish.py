@@ -0,0 +1,82 @@
+import json
+import os
+
+import numpy as np
+import pytest
+from sklearn import datasets
+from sklearn.svm import SVC
+
+import train
+from train import COMPACT_NAME, MANIFEST_NAME, MODEL_NAME, atomic_write_bytes, publish_model
+
+
+@pytest.fixture(scope="module")
+def iris():
+    return datasets.load_iris()
+
+
+def fit(iris, C=1.0):
+    return SVC(C=C).fit(iris.data, iris.target)
+
+
+def publish(iris, model_dir, C=1.0, metadata=None):
+    return publish_model(fit(iris, C), model_dir, iris.feature_names,
+                         iris.target_names.tolist(), metadata)
+
+
+def test_publish_writes_version_manifest_and_served_copies(iris, tmp_path):
+    manifest = publish(iris, tmp_path, metadata={"fingerprint": "abc"})
+    version_dir = tmp_path / "versions" / manifest["version"]
+    assert json.loads((tmp_path / MANIFEST_NAME).read_text()) == manifest
+    assert manifest["fingerprint"] == "abc"
+    assert manifest["target_names"] == iris.target_names.tolist()
+    for name in (MODEL_NAME, COMPACT_NAME):
+        assert (tmp_path / name).read_bytes() == (version_dir / name).read_bytes()
+    assert manifest["path"] == f"versions/{manifest['version']}/{MODEL_NAME}"
+    # No temp files are left behind and everything is readable by other users
+    leftovers = [path.name for path in tmp_path.rglob(".*.tmp")]
+    assert leftovers == []
+    for path in tmp_path.rglob("*"):
+        if path.is_file():
+            assert path.stat().st_mode & 0o777 == train.FILE_MODE
+
+
+def test_republishing_the_same_model_keeps_its_version(iris, tmp_path):
+    first = publish(iris, tmp_path)
+    second = publish(iris, tmp_path)
+    assert first["version"] == second["version"]
+    assert [path.name for path in (tmp_path / "versions").iterdir()] == [first["version"]]
+
+
+def test_old_versions_are_pruned(iris, tmp_path, monkeypatch):
+    monkeypatch.setattr(train, "KEEP_VERSIONS", 2)
+    versions = []
+    for C in (0.5, 1.0, 2.0, 4.0):
+        versions.append(publish(iris, tmp_path, C)["version"])
+        # Distinct mtimes even on coarse-grained file systems
+        os.utime(tmp_path / "versions" / versions[-1], (len(versions), len(versions)))
+    remaining = sorted(path.name for path in (tmp_path / "versions").iterdir())
+    assert remaining == sorted(versions[-2:])
+    assert json.loads((tmp_path / MANIFEST_NAME).read_text())["version"] == versions[-1]
+
+
+def test_failed_write_leaves_the_old_file(tmp_path, monkeypatch):
+    target = tmp_path / "model.bin"
+    atomic_write_bytes(target, b"old")
+
+    def fail(src, dst):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(train.os, "replace", fail)
+    with pytest.raises(OSError):
+        atomic_write_bytes(target, b"new")
+    assert target.read_bytes() == b"old"
+    assert [path.name for path in tmp_path.iterdir()] == ["model.bin"]
+
+
+def test_compact_export_matches_the_pickle(iris, tmp_path):
+    from compact_model import CompactSVC
+
+    publish(iris, tmp_path)
+    compact = CompactSVC.load(tmp_path / COMPACT_NAME)
+    np.testing.assert_array_equal(compact.predict(iris.data), fit(iris).predict(iris.data))
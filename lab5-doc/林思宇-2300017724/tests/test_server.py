@@ -0,0 +1,190 @@
+import importlib
+import sys
+import threading
+
+import numpy as np
+import pytest
+from sklearn import datasets
+from sklearn.svm import SVC
+
+from train import publish_model
+
+
+@pytest.fixture(scope="module")
+def server(tmp_path_factory):
+    model_dir = tmp_path_factory.mktemp("models")
+    iris = datasets.load_iris()
+    publish_model(SVC().fit(iris.data, iris.target), model_dir,
+                  iris.feature_names, iris.target_names)
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setenv("MODEL_DIR", str(model_dir))
+        patch.setenv("MODEL_FORMAT", "pickle")
+        patch.setenv("MODEL_RELOAD_INTERVAL", "0")
+        sys.modules.pop("server", None)
+        module = importlib.import_module("server")
+    module.model_store.load()
+    return module
+
+
+@pytest.fixture
+def client(server):
+    return server.app.test_client()
+
+
+def test_profile_is_off_by_default(client):
+    assert client.post("/debug/profile?seconds=0.05").status_code == 404
+
+
+def test_profile_needs_the_token(server, client, monkeypatch):
+    monkeypatch.setattr(server, "PROFILE_TOKEN", "secret")
+    assert client.post("/debug/profile?seconds=0.05").status_code == 404
+    response = client.post("/debug/profile?seconds=0.05",
+                           headers={"X-Profile-Token": "wrong"})
+    assert response.status_code == 404
+
+
+def test_profile_refuses_sync_workers(server, client, monkeypatch):
+    monkeypatch.setattr(server, "PROFILE_TOKEN", "secret")
+    response = client.post("/debug/profile?seconds=0.05",
+                           headers={"X-Profile-Token": "secret"},
+                           environ_overrides={"wsgi.multithread": False})
+    assert response.status_code == 501
+
+
+def test_profile_samples_threaded_workers(server, client, monkeypatch):
+    monkeypatch.setattr(server, "PROFILE_TOKEN", "secret")
+    stop = threading.Event()
+    busy = threading.Thread(target=stop.wait, name="busy-request")
+    busy.start()
+    try:
+        response = client.post("/debug/profile?seconds=0.05&interval_ms=5",
+                               headers={"X-Profile-Token": "secret"},
+                               environ_overrides={"wsgi.multithread": True})
+    finally:
+        stop.set()
+        busy.join()
+    assert response.status_code == 200
+    assert response.mimetype == "text/plain"
+    assert ":wait:" in response.get_data(as_text=True)
+
+
+def stage_count(endpoint, stage):
+    from prometheus_client import REGISTRY
+
+    value = REGISTRY.get_sample_value(
+        "predict_stage_seconds_count", {"endpoint": endpoint, "stage": stage}
+    )
+    return value or 0.0
+
+
+@pytest.mark.parametrize("path, endpoint", [
+    ("/predict", "predict"), ("/predict/batch", "predict_batch"),
+])
+def test_ndarray_requests_record_stages(client, path, endpoint):
+    before = {stage: stage_count(endpoint, stage) for stage in ("parse", "model", "render")}
+    response = client.post(path, data=np.array([[5.1, 3.5, 1.4, 0.2]]).tobytes(),
+                           content_type="application/x-ndarray; dtype=float64")
+    assert response.status_code == 200
+    assert np.frombuffer(response.data, dtype="<i4").tolist() == [0]
+    for stage, count in before.items():
+        assert stage_count(endpoint, stage) == count + 1
+
+
+def test_registry_skips_pickles_without_joblib(server, monkeypatch):
+    assert ".pkl" in server.registry_loaders()
+    monkeypatch.setattr(server, "PICKLE_SUPPORTED", False)
+    assert set(server.registry_loaders()) == {".npz"}
+
+
+def test_ready_once_the_model_is_loaded(server, client):
+    response = client.get("/readyz")
+    assert response.status_code == 200
+    assert response.get_json() == {"status": "ready", "version": server.model_store.current.version}
+
+
+def test_model_endpoints_wait_for_the_model(server, client, monkeypatch):
+    monkeypatch.setattr(server.model_store, "_current", None)
+    assert client.get("/healthz").status_code == 200
+    assert client.get("/readyz").get_json() == {"status": "loading"}
+    assert client.get("/readyz").status_code == 503
+    for response in (
+        client.post("/predict", json={"input": [5.1, 3.5, 1.4, 0.2]}),
+        client.post("/predict/batch", json={"inputs": [[5.1, 3.5, 1.4, 0.2]]}),
+        client.get("/model"),
+    ):
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == str(server.POLL_INTERVAL)
+
+
+SETOSA = [5.1, 3.5, 1.4, 0.2]
+VIRGINICA = [6.7, 3.0, 5.2, 2.3]
+
+
+def test_batch_of_clean_rows(client):
+    response = client.post("/predict/batch", json={"inputs": [SETOSA, VIRGINICA]})
+    assert response.status_code == 200
+    assert response.get_json() == {
+        "predictions": [
+            {"prediction": "setosa", "class_index": 0},
+            {"prediction": "virginica", "class_index": 2},
+        ],
+        "count": 2,
+        "errors": 0,
+    }
+
+
+def test_batch_reports_bad_rows_individually(client):
+    response = client.post("/predict/batch", json={"inputs": [
+        SETOSA,
+        [1.0, 2.0],
+        {"input": VIRGINICA},
+        ["a", "b", "c", "d"],
+        {"features": SETOSA},
+        [None, 0, 0, 0],
+    ]})
+    assert response.status_code == 200
+    body = response.get_json()
+    assert (body["count"], body["errors"]) == (6, 4)
+    predictions = body["predictions"]
+    assert predictions[0] == {"prediction": "setosa", "class_index": 0}
+    assert predictions[2] == {"prediction": "virginica", "class_index": 2}
+    assert predictions[1] == {"error": "Expected 4 numeric values for the iris features."}
+    assert predictions[3] == {"error": "Input array must contain numeric values."}
+    assert predictions[4] == {"error": "Row object must include an 'input' list."}
+    assert predictions[5] == {"error": "Input values must be finite numbers."}
+
+
+def test_batch_with_only_bad_rows(client):
+    body = client.post("/predict/batch", json={"inputs": [[1.0], "x"]}).get_json()
+    assert (body["count"], body["errors"]) == (2, 2)
+    assert all("error" in row for row in body["predictions"])
+
+
+@pytest.mark.parametrize("payload", [{}, {"inputs": []}, {"inputs": "x"}, [SETOSA]])
+def test_batch_without_rows_is_rejected(client, payload):
+    assert client.post("/predict/batch", json=payload).status_code == 400
+
+
+def test_batch_size_limit(server, client, monkeypatch):
+    monkeypatch.setattr(server, "MAX_BATCH_ROWS", 2)
+    response = client.post("/predict/batch", json={"inputs": [SETOSA] * 3})
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize("path", ["/predict", "/predict/batch", "/models/iris_model/predict"])
+def test_malformed_json_is_reported_as_such(client, path):
+    response = client.post(path, data=b'{"input": [5.1, 3.5,', content_type="application/json")
+    assert response.status_code == 400
+    assert response.get_json() == {"error": "Malformed JSON body."}
+
+
+def test_non_finite_json_literals_are_parsed(client):
+    body = b'{"input": [NaN, 3.5, 1.4, Infinity]}'
+    response = client.post("/predict", data=body, content_type="application/json")
+    assert response.status_code == 400
+    assert response.get_json() == {"error": "Input values must be finite numbers."}
+
+    body = b'{"inputs": [[5.1, 3.5, 1.4, 0.2], [-Infinity, 0, 0, 0]]}'
+    rows = client.post("/predict/batch", data=body, content_type="application/json").get_json()
+    assert rows["predictions"][0]["prediction"] == "setosa"
+    assert rows["predictions"][1] == {"error": "Input values must be finite numbers."}
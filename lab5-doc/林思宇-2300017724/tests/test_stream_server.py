@@ -0,0 +1,110 @@
+import logging
+import struct
+
+import numpy as np
+import pytest
+
+from stream_server import (
+    REQUEST_HEADER,
+    STATUS_BAD_FRAME,
+    STATUS_ERROR,
+    STATUS_NOT_READY,
+    STATUS_OK,
+    StreamClient,
+    StreamServer,
+)
+
+N_FEATURES = 4
+
+
+class Backend:
+    def __init__(self):
+        self.ready = True
+        self.fail = False
+        self.calls = []
+
+    def predict(self, matrix):
+        self.calls.append(len(matrix))
+        if self.fail:
+            raise RuntimeError("model exploded")
+        # Class index is the first feature, so every reply can be checked
+        return matrix[:, 0].astype(int)
+
+
+@pytest.fixture
+def backend():
+    return Backend()
+
+
+@pytest.fixture
+def client(backend):
+    server = StreamServer(("127.0.0.1", 0), backend.predict, lambda: backend.ready,
+                          n_features=N_FEATURES, max_rows=100,
+                          logger=logging.getLogger("test-stream"))
+    server.serve_in_background()
+    connection = StreamClient(*server.server_address, timeout=5)
+    yield connection
+    connection.close()
+    server.shutdown()
+    server.server_close()
+
+
+def rows(*labels):
+    matrix = np.zeros((len(labels), N_FEATURES))
+    matrix[:, 0] = labels
+    return matrix
+
+
+def test_frames_are_answered_in_order(client):
+    client.send(rows(1, 2, 0))
+    status, indices = client.receive()
+    assert status == STATUS_OK
+    assert indices.tolist() == [1, 2, 0]
+
+
+def test_pipelined_frames_are_split_back_per_frame(client, backend):
+    frames = [rows(1), rows(2, 2), rows(0, 1, 2)]
+    # One write, so the server sees every frame at once and scores them together
+    client.sock.sendall(b"".join(
+        REQUEST_HEADER.pack(len(frame)) + frame.astype("<f8").tobytes() for frame in frames
+    ))
+    replies = [client.receive() for _ in frames]
+    assert [status for status, _ in replies] == [STATUS_OK] * 3
+    assert [indices.tolist() for _, indices in replies] == [[1], [2, 2], [0, 1, 2]]
+    assert sum(backend.calls) == 6
+    assert len(backend.calls) < 3
+
+
+def test_frame_split_across_writes(client):
+    payload = REQUEST_HEADER.pack(2) + rows(2, 1).astype("<f8").tobytes()
+    client.sock.sendall(payload[:3])
+    client.sock.sendall(payload[3:20])
+    client.sock.sendall(payload[20:])
+    assert client.receive()[1].tolist() == [2, 1]
+
+
+def test_not_ready_and_errors_carry_no_indices(client, backend):
+    backend.ready = False
+    client.send(rows(1))
+    status, indices = client.receive()
+    assert (status, len(indices)) == (STATUS_NOT_READY, 0)
+
+    backend.ready, backend.fail = True, True
+    client.send(rows(1))
+    status, indices = client.receive()
+    assert (status, len(indices)) == (STATUS_ERROR, 0)
+
+    # The connection stays usable after either
+    backend.fail = False
+    client.send(rows(2))
+    status, indices = client.receive()
+    assert (status, indices.tolist()) == (STATUS_OK, [2])
+
+
+@pytest.mark.parametrize("n_rows", [0, 101])
+def test_bad_frame_closes_the_connection(client, n_rows):
+    client.sock.sendall(struct.pack("<I", n_rows))
+    status, indices = client.receive()
+    assert (status, len(indices)) == (STATUS_BAD_FRAME, 0)
+    with pytest.raises(ConnectionError):
+        client.receive()
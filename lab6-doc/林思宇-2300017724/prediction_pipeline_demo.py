@@ -1,23 +1,284 @@
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+
 import pandas as pd
 import numpy as np
-from sklearn.model_selection import train_test_split
+from sklearn.model_selection import KFold, ShuffleSplit, train_test_split
 from sklearn.linear_model import LinearRegression
+from sklearn.metrics import r2_score
+
+# Declarative description of the housing columns. Categorical columns list
+# their categories so the one-hot layout is fixed up front; a category list of
+# None is learned from the data passed to compile_schema().
+HOUSING_SCHEMA = {
+    "target": "price",
+    "numeric": ["area", "bedrooms", "bathrooms", "stories", "parking"],
+    "binary": ["mainroad", "guestroom", "basement", "hotwaterheating",
+               "airconditioning", "prefarea"],
+    "categorical": {"furnishingstatus": ["furnished", "semi-furnished", "unfurnished"]},
+}
+
+
+class FeatureTransformer:
+    """
+    A compiled feature schema with a fixed output column layout.
+    Numeric columns pass through as floats, yes/no columns become 0/1 and
+    each categorical column becomes one 0/1 column per known category, so
+    training data and single rows scored later get identical columns.
+    """
+
+    def __init__(self, numeric, binary, categories, target=None):
+        self.target = target
+        self.numeric = list(numeric)
+        self.binary = list(binary)
+        self.categories = {column: list(values) for column, values in categories.items()}
+        self.columns = self.numeric + self.binary + [
+            f"{column}_{value}"
+            for column, values in self.categories.items()
+            for value in values
+        ]
+
+    def transform_array(self, df: pd.DataFrame, out: np.ndarray = None) -> np.ndarray:
+        """
+        Return the feature matrix for df (n_rows x len(columns)), float64
+        unless it is written into a preallocated out array of another dtype.
+        """
+        n_rows = len(df)
+        if out is None:
+            out = np.zeros((n_rows, len(self.columns)))
+        else:
+            out[...] = 0
+        position = 0
+        for column in self.numeric:
+            out[:, position] = df[column].to_numpy(dtype=float)
+            position += 1
+        for column in self.binary:
+            out[:, position] = _yes_no(df[column])
+            position += 1
+        rows = np.arange(n_rows)
+        for column, values in self.categories.items():
+            # Integer codes index straight into the one-hot block; categories
+            # outside the schema get code -1 and leave the block all zero.
+            codes = pd.Index(values).get_indexer(df[column])
+            known = codes >= 0
+            out[rows[known], position + codes[known]] = 1.0
+            position += len(values)
+        return out
+
+    def transform(self, df: pd.DataFrame) -> pd.DataFrame:
+        return pd.DataFrame(self.transform_array(df), columns=self.columns, index=df.index)
+
+
+def _yes_no(series: pd.Series) -> np.ndarray:
+    """Map a yes/no (or already boolean) column to 0/1."""
+    if series.dtype == bool:
+        return series.to_numpy(dtype=float)
+    values = series.to_numpy(dtype=object)
+    is_yes = values == "yes"
+    if not (is_yes | (values == "no")).all():
+        raise ValueError(f"Column {series.name!r} must only contain 'yes' or 'no'.")
+    return is_yes.astype(float)
+
+
+def compile_schema(schema: dict = HOUSING_SCHEMA, df: pd.DataFrame = None) -> FeatureTransformer:
+    """
+    Build the FeatureTransformer for a schema.
+    Categorical columns without a declared category list take the sorted
+    categories found in df.
+    """
+    categories = {}
+    for column, values in schema.get("categorical", {}).items():
+        if values is None:
+            if df is None:
+                raise ValueError(f"Categories of {column!r} must be declared or learned from data.")
+            values = sorted(df[column].dropna().unique())
+        categories[column] = values
+    return FeatureTransformer(
+        schema.get("numeric", []), schema.get("binary", []), categories, schema.get("target")
+    )
+
 
-def data_preparation(df: pd.DataFrame):
+def data_preparation(df: pd.DataFrame, transformer: FeatureTransformer = None):
     """
-    Select target column and one categorical feature, and one-hot encode it.
+    Encode all housing features with the schema and select the target column.
+    Pass the transformer used at training time to get the same columns for new data.
     Returns (feature_df, target_series).
     """
-    target = "price"
-    features = ["furnishingstatus"]
+    if transformer is None:
+        transformer = compile_schema(HOUSING_SCHEMA, df)
+    feature_df = transformer.transform(df)
+    target_series = df.loc[:, transformer.target]
+    return feature_df, target_series
 
-    feature_df = pd.get_dummies(
-        df.loc[:, features],
-        columns=["furnishingstatus"]
+def csv_dtypes(transformer: FeatureTransformer) -> dict:
+    """
+    Explicit read_csv dtypes for the transformer's columns: float32 numerics,
+    bool yes/no flags and categoricals with the schema's fixed categories.
+    The target stays float64 so large prices are not rounded.
+    """
+    dtypes = {column: np.float32 for column in transformer.numeric}
+    dtypes.update({column: bool for column in transformer.binary})
+    dtypes.update({
+        column: pd.CategoricalDtype(values) for column, values in transformer.categories.items()
+    })
+    if transformer.target is not None:
+        dtypes[transformer.target] = np.float64
+    return dtypes
+
+
+def _read_chunks(path, transformer: FeatureTransformer, chunksize: int):
+    """Parse only the schema's columns of a CSV, chunksize rows at a time."""
+    dtypes = csv_dtypes(transformer)
+    return pd.read_csv(
+        path,
+        usecols=list(dtypes),
+        dtype=dtypes,
+        true_values=["yes"],
+        false_values=["no"],
+        chunksize=chunksize,
     )
-    target_series = df.loc[:, target]
+
+
+def stream_preparation(path, transformer: FeatureTransformer = None, chunksize: int = 10_000):
+    """
+    Read a housing CSV chunk by chunk and yield (feature_df, target_series)
+    for each chunk, so memory is bounded by chunksize rather than file size.
+    Only the schema's columns are parsed. The categories must be declared,
+    since every chunk has to be encoded with the same columns.
+    """
+    if transformer is None:
+        transformer = compile_schema(HOUSING_SCHEMA)
+    for chunk in _read_chunks(path, transformer, chunksize):
+        yield data_preparation(chunk, transformer)
+
+
+def feature_dtype(transformer: FeatureTransformer) -> np.dtype:
+    """Dtype of the chunked feature matrix: that of the parsed numeric columns."""
+    dtypes = csv_dtypes(transformer)
+    return np.result_type(np.float32, *(dtypes[column] for column in transformer.numeric))
+
+
+def _load_chunked(path, transformer: FeatureTransformer, chunksize: int):
+    """
+    Encode a CSV chunk by chunk straight into one preallocated matrix.
+    A first pass that parses only the target column counts the rows, so
+    peak memory is the final matrix (float32, like the parsed numerics)
+    plus one chunk, instead of every encoded chunk plus their concatenation.
+    """
+    n_rows = sum(
+        len(chunk) for chunk in pd.read_csv(path, usecols=[transformer.target], chunksize=chunksize)
+    )
+    features = np.empty((n_rows, len(transformer.columns)), dtype=feature_dtype(transformer))
+    target = np.empty(n_rows)
+    start = 0
+    for chunk in _read_chunks(path, transformer, chunksize):
+        stop = start + len(chunk)
+        if stop > n_rows:
+            raise ValueError(f"{path} changed while it was being read.")
+        transformer.transform_array(chunk, out=features[start:stop])
+        target[start:stop] = chunk[transformer.target].to_numpy(dtype=float)
+        start = stop
+    if start != n_rows:
+        raise ValueError(f"{path} changed while it was being read.")
+    feature_df = pd.DataFrame(features, columns=transformer.columns, copy=False)
+    return feature_df, pd.Series(target, name=transformer.target, copy=False)
+
+
+def load_dataset(path, chunksize: int = 0, cache_dir=None, transformer: FeatureTransformer = None):
+    """
+    Return (feature_df, target_series) for a housing CSV, read in one go or,
+    with a positive chunksize, chunk by chunk into float32 features with
+    bounded memory. With a cache_dir the prepared data is served from the
+    dataset cache.
+    """
+    if transformer is None:
+        transformer = compile_schema(HOUSING_SCHEMA)
+    if cache_dir is not None:
+        return cached_dataset(path, cache_dir, transformer, chunksize)
+    if chunksize <= 0:
+        return data_preparation(pd.read_csv(path), transformer)
+    return _load_chunked(path, transformer, chunksize)
+
+
+# Bump when the on-disk layout below changes, so old entries are ignored.
+# 2: features are stored in the dtype they were loaded with.
+CACHE_FORMAT = 2
+
+
+def _hash_file(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as source:
+        for block in iter(lambda: source.read(1 << 20), b""):
+            digest.update(block)
+    return digest
+
+
+def file_digest(path) -> str:
+    """SHA-256 of a file's bytes, read in blocks."""
+    return _hash_file(path).hexdigest()
+
+
+def dataset_cache_key(path, transformer: FeatureTransformer, dtype=np.float64) -> str:
+    """Hash of the CSV's bytes and the feature configuration that encodes it."""
+    digest = _hash_file(path)
+    config = {
+        "format": CACHE_FORMAT,
+        "dtype": np.dtype(dtype).name,
+        "target": transformer.target,
+        "columns": transformer.columns,
+        "categories": {column: [str(value) for value in values]
+                       for column, values in transformer.categories.items()},
+    }
+    digest.update(json.dumps(config, sort_keys=True).encode())
+    return digest.hexdigest()
+
+
+def cached_dataset(path, cache_dir, transformer: FeatureTransformer, chunksize: int = 0):
+    """
+    Load the prepared (feature_df, target_series) for a CSV from cache_dir,
+    preparing and storing it first on a miss.
+    Entries are plain .npy files that are memory-mapped read-only, so a hit
+    neither parses text nor copies the matrix into memory.
+    """
+    dtype = feature_dtype(transformer) if chunksize > 0 else np.float64
+    entry = Path(cache_dir) / dataset_cache_key(path, transformer, dtype)
+    if not entry.is_dir():
+        feature_df, target_series = load_dataset(path, chunksize, transformer=transformer)
+        _write_cache_entry(entry, feature_df, target_series)
+
+    meta = json.loads((entry / "meta.json").read_text())
+    features = np.load(entry / "features.npy", mmap_mode="r")
+    target = np.load(entry / "target.npy", mmap_mode="r")
+    feature_df = pd.DataFrame(features, columns=meta["columns"], copy=False)
+    target_series = pd.Series(target, name=meta["target"], copy=False)
     return feature_df, target_series
 
+
+def _write_cache_entry(entry: Path, feature_df: pd.DataFrame, target_series: pd.Series):
+    """Write an entry into a temporary directory and rename it into place."""
+    entry.parent.mkdir(parents=True, exist_ok=True)
+    staging = Path(tempfile.mkdtemp(dir=entry.parent, prefix=".staging-"))
+    try:
+        np.save(staging / "features.npy", feature_df.to_numpy())
+        np.save(staging / "target.npy", target_series.to_numpy())
+        meta = {"columns": list(feature_df.columns), "target": target_series.name}
+        (staging / "meta.json").write_text(json.dumps(meta))
+        os.replace(staging, entry)
+    except OSError:
+        # Another run stored the same entry first; keep theirs
+        if not entry.is_dir():
+            raise
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+
+
 def data_split(features: pd.DataFrame, target: pd.Series):
     """
     Deterministic split with random_state for reproducibility.
@@ -40,10 +301,348 @@ def eval_model(X_test: np.ndarray, y_test: np.ndarray, model: LinearRegression):
     """Return R^2 score on the test set."""
     return model.score(X_test, y_test)
 
+
+class IncrementalLinearRegression:
+    """
+    Ordinary least squares that learns batch by batch.
+    Only the sufficient statistics are kept: the sample count, feature and
+    target means and the centered cross-products Sxx = Xc^T Xc and
+    Sxy = Xc^T yc. Each batch is merged in O(batch * d^2) with Chan's
+    pairwise update, which avoids the cancellation of raw X^T X sums, and
+    solving Sxx coef = Sxy gives the same minimum-norm solution as
+    LinearRegression().fit() on all rows seen so far. sources_ lists the
+    digests of the files already folded in, so none is applied twice.
+    """
+
+    def __init__(self, columns=None):
+        self.columns = None if columns is None else list(columns)
+        self.sources_ = []
+        self.n_samples_ = 0
+        self.x_mean_ = None
+        self.y_mean_ = 0.0
+        self.sxx_ = None
+        self.sxy_ = None
+        self.coef_ = None
+        self.intercept_ = None
+
+    def partial_fit(self, X, y):
+        """Merge one batch into the statistics and re-solve for the coefficients."""
+        self._check_columns(X)
+        X = np.asarray(X, dtype=float)
+        y = np.asarray(y, dtype=float)
+        if X.ndim != 2 or len(X) != len(y):
+            raise ValueError("X must be 2-D with one row per target value.")
+        if not len(X):
+            return self
+
+        batch_n = len(X)
+        batch_x_mean = X.mean(axis=0)
+        batch_y_mean = y.mean()
+        Xc = X - batch_x_mean
+        batch_sxx = Xc.T @ Xc
+        batch_sxy = Xc.T @ (y - batch_y_mean)
+
+        if self.n_samples_ == 0:
+            self.x_mean_, self.y_mean_ = batch_x_mean, batch_y_mean
+            self.sxx_, self.sxy_ = batch_sxx, batch_sxy
+        else:
+            if X.shape[1] != len(self.x_mean_):
+                raise ValueError(f"Expected {len(self.x_mean_)} features, got {X.shape[1]}.")
+            total = self.n_samples_ + batch_n
+            dx = batch_x_mean - self.x_mean_
+            dy = batch_y_mean - self.y_mean_
+            weight = self.n_samples_ * batch_n / total
+            self.sxx_ = self.sxx_ + batch_sxx + weight * np.outer(dx, dx)
+            self.sxy_ = self.sxy_ + batch_sxy + weight * dx * dy
+            self.x_mean_ = self.x_mean_ + dx * batch_n / total
+            self.y_mean_ = self.y_mean_ + dy * batch_n / total
+        self.n_samples_ += batch_n
+        self._solve()
+        return self
+
+    def _check_columns(self, X):
+        columns = getattr(X, "columns", None)
+        if columns is None:
+            return
+        if self.columns is None:
+            self.columns = list(columns)
+        elif list(columns) != self.columns:
+            raise ValueError("Feature columns differ from the ones the model was trained on.")
+
+    def _solve(self):
+        self.coef_ = np.linalg.lstsq(self.sxx_, self.sxy_, rcond=None)[0]
+        self.intercept_ = self.y_mean_ - self.x_mean_ @ self.coef_
+
+    def predict(self, X) -> np.ndarray:
+        if self.coef_ is None:
+            raise ValueError("The model has not seen any data yet.")
+        return np.asarray(X, dtype=float) @ self.coef_ + self.intercept_
+
+    def score(self, X, y) -> float:
+        """R^2 of the predictions, like LinearRegression.score()."""
+        return float(r2_score(y, self.predict(X)))
+
+    def save(self, path):
+        """Persist the statistics atomically (write to a temp file, then rename)."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".npz")
+        try:
+            with os.fdopen(fd, "wb") as out:
+                np.savez(
+                    out,
+                    n_samples=self.n_samples_,
+                    x_mean=self.x_mean_,
+                    y_mean=self.y_mean_,
+                    sxx=self.sxx_,
+                    sxy=self.sxy_,
+                    columns=np.array(self.columns or [], dtype=str),
+                    sources=np.array(self.sources_, dtype=str),
+                )
+            os.replace(tmp, path)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+    @classmethod
+    def load(cls, path) -> "IncrementalLinearRegression":
+        with np.load(path, allow_pickle=False) as state:
+            model = cls(state["columns"].tolist() or None)
+            model.n_samples_ = int(state["n_samples"])
+            model.x_mean_ = state["x_mean"]
+            model.y_mean_ = float(state["y_mean"])
+            model.sxx_ = state["sxx"]
+            model.sxy_ = state["sxy"]
+            # States saved before sources were tracked have none recorded
+            model.sources_ = state["sources"].tolist() if "sources" in state.files else []
+        model._solve()
+        return model
+
+
+def update_model(state_path, X_batch, y_batch) -> IncrementalLinearRegression:
+    """
+    Fold a new batch into the model persisted at state_path (created on the
+    first call) without revisiting earlier batches, and save it back.
+    """
+    if Path(state_path).exists():
+        model = IncrementalLinearRegression.load(state_path)
+    else:
+        model = IncrementalLinearRegression()
+    model.partial_fit(X_batch, y_batch)
+    model.save(state_path)
+    return model
+
+
+class SourceAlreadyApplied(ValueError):
+    """Raised when a file has already been folded into a model state."""
+
+
+def _split_chunk(features: pd.DataFrame, target: pd.Series, holdout: float):
+    """
+    Hold out a holdout fraction of one chunk (random_state 42, so 0.33 is
+    exactly data_split()); with no holdout or a single row, all rows train.
+    """
+    if holdout <= 0 or len(target) < 2:
+        return features, features.iloc[:0], target, target.iloc[:0]
+    return train_test_split(features, target, test_size=holdout, random_state=42)
+
+
+def train_incremental(path, state_path, chunksize: int = 10_000,
+                      transformer: FeatureTransformer = None, holdout: float = 0.0):
+    """
+    Stream a housing CSV into the model persisted at state_path.
+    Every row goes straight to partial_fit(), so memory is bounded by the
+    chunk size however large the file is, and the state matches a full refit
+    on all files applied so far; it is saved once at the end. Raises
+    SourceAlreadyApplied if this file's contents are already in the state.
+    With a holdout fraction, that share of every chunk is kept out of the
+    state instead and a second streaming pass scores the model on it.
+    Returns (model, R^2 on the held-out rows, or None without a holdout).
+    """
+    if Path(state_path).exists():
+        model = IncrementalLinearRegression.load(state_path)
+    else:
+        model = IncrementalLinearRegression()
+    source = file_digest(path)
+    if source in model.sources_:
+        raise SourceAlreadyApplied(f"{path} has already been applied to {state_path}.")
+    for features, target in stream_preparation(path, transformer, chunksize):
+        X_train, _, y_train, _ = _split_chunk(features, target, holdout)
+        model.partial_fit(X_train, y_train)
+    model.sources_.append(source)
+    model.save(state_path)
+    if holdout <= 0:
+        return model, None
+
+    # R^2 = 1 - SS_res / SS_tot, with SS_tot merged chunk by chunk (Chan et al.)
+    n, mean, ss_tot, ss_res = 0, 0.0, 0.0, 0.0
+    for features, target in stream_preparation(path, transformer, chunksize):
+        _, X_test, _, y_test = _split_chunk(features, target, holdout)
+        if not len(y_test):
+            continue
+        y = y_test.to_numpy(dtype=float)
+        ss_res += float(((y - model.predict(X_test)) ** 2).sum())
+        batch_mean = y.mean()
+        total = n + len(y)
+        delta = batch_mean - mean
+        ss_tot += ((y - batch_mean) ** 2).sum() + delta ** 2 * n * len(y) / total
+        mean += delta * len(y) / total
+        n = total
+    score = 1 - ss_res / ss_tot if ss_tot > 0 else float("nan")
+    return model, score
+
+
+# Set in each worker process by _attach_dataset(): read-only memory maps of
+# the feature matrix and target, shared through the page cache.
+_SHARED_DATA = None
+
+
+def _map_dataset(features_path, target_path):
+    return np.load(features_path, mmap_mode="r"), np.load(target_path, mmap_mode="r")
+
+
+def _attach_dataset(features_path, target_path):
+    global _SHARED_DATA
+    _SHARED_DATA = _map_dataset(features_path, target_path)
+
+
+def _npy_path(array: np.ndarray):
+    """
+    Path of the .npy file array is a read-only memory map of in full (as
+    cached_dataset() returns), or None. Workers can map that file directly.
+    """
+    base = array
+    while base is not None and not isinstance(base, np.memmap):
+        base = base.base
+    if base is None or base.filename is None or base.flags.writeable:
+        return None
+    fortran_order = array.flags.f_contiguous and not array.flags.c_contiguous
+    if (array.__array_interface__["data"][0] != base.__array_interface__["data"][0]
+            or array.shape != base.shape or array.dtype != base.dtype
+            or not (array.flags.c_contiguous or fortran_order)):
+        return None
+    try:
+        with open(base.filename, "rb") as npy:
+            if np.lib.format.read_magic(npy) == (1, 0):
+                header = np.lib.format.read_array_header_1_0(npy)
+            else:
+                header = np.lib.format.read_array_header_2_0(npy)
+            offset = npy.tell()
+    except (OSError, ValueError):
+        return None
+    if header != (array.shape, fortran_order, array.dtype) or offset != base.offset:
+        return None
+    return base.filename
+
+
+def _score_split(split, data=None):
+    """Fit on one split's training rows and return R^2 on its test rows."""
+    features, target = data or _SHARED_DATA
+    train_idx, test_idx = split
+    model = train_model(features[train_idx], target[train_idx])
+    return eval_model(features[test_idx], target[test_idx], model)
+
+
+def cross_validate(features, target, method: str = "kfold", n_splits: int = 5,
+                   test_size: float = 0.33, n_jobs: int = None, random_state: int = 42) -> dict:
+    """
+    Score the model over many splits instead of data_split()'s single one.
+    method "kfold" uses n_splits shuffled folds; "repeated" uses n_splits
+    random train/test splits of test_size. Splits are scored in parallel by
+    a process pool. Every worker memory-maps the feature matrix from an .npy
+    file, so it is never pickled to the workers; only the row indices of
+    each split are sent. Data already mapped from .npy files (as the dataset
+    cache returns it) is shared as is; anything else is written to a temp
+    file once. With n_jobs == 1 the data is used in place. n_jobs of None
+    or <= 0 uses every CPU.
+    Returns the per-split R^2 scores with their mean, std and wall time.
+    """
+    if method == "kfold":
+        splitter = KFold(n_splits=n_splits, shuffle=True, random_state=random_state)
+    elif method == "repeated":
+        splitter = ShuffleSplit(n_splits=n_splits, test_size=test_size, random_state=random_state)
+    else:
+        raise ValueError(f"Unknown method {method!r}; use 'kfold' or 'repeated'.")
+    if n_jobs is None or n_jobs <= 0:  # like joblib's -1: use every core
+        n_jobs = os.cpu_count() or 1
+    n_jobs = min(n_jobs, n_splits)
+
+    start = time.perf_counter()
+    # Numeric data (e.g. float32 features from a chunked load, or integer
+    # prices) is used as it is, so memory-mapped input is not copied
+    features, target = np.asarray(features), np.asarray(target)
+    if features.dtype.kind != "f":
+        features = features.astype(np.float64)
+    if target.dtype.kind not in "iuf":
+        target = target.astype(np.float64)
+    splits = list(splitter.split(features))
+    if n_jobs == 1:
+        scores = [_score_split(split, (features, target)) for split in splits]
+    else:
+        with tempfile.TemporaryDirectory(prefix="housing-cv-") as tmp:
+            paths = []
+            for name, array in (("features", features), ("target", target)):
+                path = _npy_path(array)
+                if path is None:
+                    path = os.path.join(tmp, f"{name}.npy")
+                    np.save(path, array)
+                paths.append(path)
+            with ProcessPoolExecutor(
+                max_workers=n_jobs,
+                initializer=_attach_dataset,
+                initargs=tuple(paths),
+            ) as pool:
+                scores = list(pool.map(_score_split, splits))
+    wall_time = time.perf_counter() - start
+
+    return {
+        "method": method,
+        "n_splits": n_splits,
+        "n_jobs": n_jobs,
+        "scores": [float(score) for score in scores],
+        "mean": float(np.mean(scores)),
+        "std": float(np.std(scores)),
+        "wall_time_s": round(wall_time, 3),
+    }
+
+
 if __name__ == "__main__":
-    df_raw = pd.read_csv("Housing.csv")
-    feature_df, target_series = data_preparation(df_raw)
-    X_train, X_test, y_train, y_test = data_split(feature_df, target_series)
-    reg = train_model(X_train, y_train)
-    eval_score = eval_model(X_test, y_test, reg)
-    print(f"Trained model score is: {eval_score}")
+    parser = argparse.ArgumentParser(description="Train and score the housing price model.")
+    parser.add_argument("--csv", default="Housing.csv", help="housing data to train on")
+    parser.add_argument("--chunksize", type=int, default=0,
+                        help="stream the CSV in chunks of this many rows (0 reads it at once)")
+    parser.add_argument("--cache-dir",
+                        help="reuse prepared features from this directory instead of parsing the CSV")
+    parser.add_argument("--state",
+                        help="train incrementally: stream this CSV's rows (in --chunksize chunks, "
+                             "default 10000) into the model state in this file")
+    parser.add_argument("--holdout", type=float, default=0.0,
+                        help="with --state, keep this fraction of every chunk out of the "
+                             "state to score the model on (default 0: train on every row)")
+    parser.add_argument("--cv", choices=["kfold", "repeated"],
+                        help="evaluate over k folds or repeated random splits instead of one split")
+    parser.add_argument("--splits", type=int, default=5, help="folds or repeats for --cv")
+    parser.add_argument("--jobs", type=int, help="worker processes for --cv (default or <= 0: all CPUs)")
+    args = parser.parse_args()
+
+    if args.state:
+        try:
+            reg, eval_score = train_incremental(args.csv, args.state, args.chunksize or 10_000,
+                                                holdout=args.holdout)
+        except SourceAlreadyApplied as exc:
+            print(f"{exc} Skipping it.")
+        else:
+            print(f"Model state now covers {reg.n_samples_} rows.")
+            if eval_score is not None:
+                print(f"Trained model score is: {eval_score}")
+    else:
+        feature_df, target_series = load_dataset(args.csv, args.chunksize, args.cache_dir)
+        if args.cv:
+            result = cross_validate(feature_df, target_series, args.cv, args.splits,
+                                    n_jobs=args.jobs)
+            print(json.dumps(result, indent=2))
+        else:
+            X_train, X_test, y_train, y_test = data_split(feature_df, target_series)
+            reg = train_model(X_train, y_train)
+            eval_score = eval_model(X_test, y_test, reg)
+            print(f"Trained model score is: {eval_score}")
@@ -1,7 +1,28 @@
+from pathlib import Path
+
 import pytest
 import pandas as pd
 import numpy as np
-from prediction_pipeline_demo import data_preparation, data_split, train_model, eval_model
+from sklearn.linear_model import LinearRegression
+from sklearn.model_selection import KFold, cross_val_score
+from prediction_pipeline_demo import (
+    HOUSING_SCHEMA,
+    IncrementalLinearRegression,
+    SourceAlreadyApplied,
+    compile_schema,
+    cross_validate,
+    csv_dtypes,
+    data_preparation,
+    data_split,
+    dataset_cache_key,
+    eval_model,
+    file_digest,
+    load_dataset,
+    stream_preparation,
+    train_incremental,
+    train_model,
+    update_model,
+)
 
 @pytest.fixture
 def housing_data_sample():
@@ -68,3 +89,242 @@ def test_end_to_end_train_and_eval(feature_target_sample):
     # Score should be a finite float value
     assert isinstance(score, float)
     assert np.isfinite(score)
+
+
+def test_schema_covers_all_housing_columns(housing_data_sample):
+    feature_df, _ = data_preparation(housing_data_sample)
+    assert list(feature_df.columns) == compile_schema().columns
+    assert feature_df["area"].tolist() == housing_data_sample["area"].tolist()
+    assert feature_df["mainroad"].tolist() == [1.0, 0.0] * 5
+    # semi-furnished never appears in the sample but keeps its column
+    assert feature_df["furnishingstatus_semi-furnished"].sum() == 0
+    assert (feature_df.filter(like="furnishingstatus_").sum(axis=1) == 1).all()
+
+
+def test_transformer_keeps_layout_for_single_rows(housing_data_sample):
+    transformer = compile_schema(HOUSING_SCHEMA, housing_data_sample)
+    train_features, _ = data_preparation(housing_data_sample, transformer)
+    new_row = housing_data_sample.drop(columns="price").iloc[[1]]
+    row_features = transformer.transform(new_row)
+    assert list(row_features.columns) == list(train_features.columns)
+    np.testing.assert_array_equal(row_features.to_numpy(), train_features.iloc[[1]].to_numpy())
+
+
+def test_transformer_unknown_category_and_invalid_binary(housing_data_sample):
+    transformer = compile_schema()
+    row = housing_data_sample.iloc[[0]].copy()
+    row["furnishingstatus"] = "luxury"
+    assert transformer.transform(row).filter(like="furnishingstatus_").to_numpy().sum() == 0
+    row["mainroad"] = "maybe"
+    with pytest.raises(ValueError):
+        transformer.transform(row)
+
+
+def test_compile_schema_learns_undeclared_categories(housing_data_sample):
+    schema = {**HOUSING_SCHEMA, "categorical": {"furnishingstatus": None}}
+    transformer = compile_schema(schema, housing_data_sample)
+    assert transformer.categories["furnishingstatus"] == ["furnished", "unfurnished"]
+    with pytest.raises(ValueError):
+        compile_schema(schema)
+
+
+def test_csv_dtypes_follow_schema():
+    dtypes = csv_dtypes(compile_schema())
+    assert dtypes["area"] == np.float32
+    assert dtypes["mainroad"] is bool
+    assert list(dtypes["furnishingstatus"].categories) == HOUSING_SCHEMA["categorical"]["furnishingstatus"]
+    assert dtypes["price"] == np.float64
+
+
+def test_stream_preparation_matches_full_read(housing_data_sample, tmp_path):
+    csv_path = tmp_path / "housing.csv"
+    housing_data_sample.to_csv(csv_path, index=False)
+    chunks = list(stream_preparation(csv_path, chunksize=4))
+    assert [len(features) for features, _ in chunks] == [4, 4, 2]
+
+    full_features, full_target = load_dataset(csv_path)
+    streamed_features, streamed_target = load_dataset(csv_path, chunksize=4)
+    assert list(streamed_features.columns) == list(full_features.columns)
+    np.testing.assert_allclose(streamed_features.to_numpy(), full_features.to_numpy())
+    np.testing.assert_allclose(streamed_target.to_numpy(), full_target.to_numpy())
+
+
+def test_cached_dataset_is_reused_and_memory_mapped(housing_data_sample, tmp_path):
+    csv_path = tmp_path / "housing.csv"
+    housing_data_sample.to_csv(csv_path, index=False)
+    cache_dir = tmp_path / "cache"
+
+    expected_features, expected_target = load_dataset(csv_path)
+    first_features, first_target = load_dataset(csv_path, cache_dir=cache_dir)
+    entries = list(cache_dir.iterdir())
+    assert len(entries) == 1
+
+    second_features, second_target = load_dataset(csv_path, cache_dir=cache_dir)
+    assert list(cache_dir.iterdir()) == entries
+    assert list(second_features.columns) == list(expected_features.columns)
+    np.testing.assert_allclose(second_features.to_numpy(), expected_features.to_numpy())
+    np.testing.assert_allclose(second_target.to_numpy(), expected_target.to_numpy())
+    assert second_target.name == "price"
+    # Served straight from the .npy file rather than a parsed copy
+    mapped = np.load(entries[0] / "features.npy", mmap_mode="r")
+    assert not second_features.to_numpy().flags.writeable
+    np.testing.assert_array_equal(mapped, second_features.to_numpy())
+
+
+def test_chunked_load_keeps_float32_features(housing_data_sample, tmp_path):
+    csv_path = tmp_path / "housing.csv"
+    housing_data_sample.to_csv(csv_path, index=False)
+    features, target = load_dataset(csv_path, chunksize=3)
+    assert set(features.dtypes) == {np.dtype(np.float32)}
+    assert target.dtype == np.float64
+    assert target.name == "price"
+
+    cache_dir = tmp_path / "cache"
+    cached, _ = load_dataset(csv_path, chunksize=3, cache_dir=cache_dir)
+    full, _ = load_dataset(csv_path, cache_dir=cache_dir)
+    assert set(cached.dtypes) == {np.dtype(np.float32)}
+    assert set(full.dtypes) == {np.dtype(np.float64)}
+    assert len(list(cache_dir.iterdir())) == 2
+
+
+def test_dataset_cache_key_tracks_source_and_schema(housing_data_sample, tmp_path):
+    csv_path = tmp_path / "housing.csv"
+    housing_data_sample.to_csv(csv_path, index=False)
+    key = dataset_cache_key(csv_path, compile_schema())
+    assert dataset_cache_key(csv_path, compile_schema()) == key
+
+    assert dataset_cache_key(csv_path, compile_schema(), np.float32) != key
+
+    narrower = {**HOUSING_SCHEMA, "numeric": ["area"]}
+    assert dataset_cache_key(csv_path, compile_schema(narrower)) != key
+
+    housing_data_sample.iloc[:5].to_csv(csv_path, index=False)
+    assert dataset_cache_key(csv_path, compile_schema()) != key
+
+
+HOUSING_CSV = Path(__file__).resolve().parents[1] / "Housing.csv"
+
+
+@pytest.fixture
+def housing_features():
+    return load_dataset(HOUSING_CSV)
+
+
+def test_incremental_regression_matches_full_refit(housing_features):
+    X, y = housing_features
+    full = LinearRegression().fit(X, y)
+    model = IncrementalLinearRegression()
+    for start in range(0, len(X), 50):
+        model.partial_fit(X.iloc[start:start + 50], y.iloc[start:start + 50])
+    assert model.n_samples_ == len(X)
+    np.testing.assert_allclose(model.predict(X), full.predict(X), rtol=1e-9)
+    np.testing.assert_allclose(model.coef_, full.coef_, rtol=1e-6, atol=1e-3)
+    assert model.score(X, y) == pytest.approx(full.score(X, y))
+
+
+def test_update_model_persists_state(housing_features, tmp_path):
+    X, y = housing_features
+    state_path = tmp_path / "state.npz"
+    update_model(state_path, X.iloc[:300], y.iloc[:300])
+    model = update_model(state_path, X.iloc[300:], y.iloc[300:])
+    reloaded = IncrementalLinearRegression.load(state_path)
+    assert reloaded.n_samples_ == len(X)
+    assert reloaded.columns == list(X.columns)
+    np.testing.assert_allclose(reloaded.predict(X), model.predict(X))
+    np.testing.assert_allclose(
+        reloaded.predict(X), LinearRegression().fit(X, y).predict(X), rtol=1e-9
+    )
+
+
+def test_incremental_regression_rejects_mismatched_input(housing_features):
+    X, y = housing_features
+    model = IncrementalLinearRegression()
+    with pytest.raises(ValueError):
+        model.predict(X)
+    model.partial_fit(X.iloc[:100], y.iloc[:100])
+    with pytest.raises(ValueError):
+        model.partial_fit(X.iloc[100:200, :-1], y.iloc[100:200])
+    with pytest.raises(ValueError):
+        model.partial_fit(X.iloc[100:200].to_numpy()[:, :-1], y.iloc[100:200])
+
+
+def test_cross_validate_kfold_matches_sklearn(housing_features):
+    X, y = housing_features
+    result = cross_validate(X, y, "kfold", n_splits=5, n_jobs=1)
+    expected = cross_val_score(
+        LinearRegression(), X, y, cv=KFold(n_splits=5, shuffle=True, random_state=42)
+    )
+    np.testing.assert_allclose(result["scores"], expected)
+    assert result["mean"] == pytest.approx(expected.mean())
+    assert result["std"] == pytest.approx(expected.std())
+    assert result["wall_time_s"] >= 0
+
+
+def test_cross_validate_parallel_matches_serial(housing_features):
+    X, y = housing_features
+    serial = cross_validate(X, y, "repeated", n_splits=6, n_jobs=1)
+    parallel = cross_validate(X, y, "repeated", n_splits=6, n_jobs=2)
+    assert parallel["n_jobs"] == 2
+    assert len(parallel["scores"]) == 6
+    np.testing.assert_allclose(parallel["scores"], serial["scores"])
+    all_cores = cross_validate(X, y, "repeated", n_splits=2, n_jobs=-1)
+    assert all_cores["n_jobs"] >= 1
+    np.testing.assert_allclose(all_cores["scores"], serial["scores"][:2])
+    with pytest.raises(ValueError):
+        cross_validate(X, y, "bootstrap")
+
+
+def test_cross_validate_shares_cached_data_without_copies(tmp_path, monkeypatch):
+    X, y = load_dataset(HOUSING_CSV, cache_dir=tmp_path / "cache")
+    saved = []
+    save = np.save
+    monkeypatch.setattr(np, "save", lambda path, array: saved.append(path) or save(path, array))
+
+    serial = cross_validate(X, y, "kfold", n_splits=4, n_jobs=1)
+    parallel = cross_validate(X, y, "kfold", n_splits=4, n_jobs=2)
+    # The workers map the cache's own .npy files; nothing is written
+    assert saved == []
+    np.testing.assert_allclose(parallel["scores"], serial["scores"])
+
+    in_memory = cross_validate(X.to_numpy().copy(), y.to_numpy().copy(), "kfold",
+                               n_splits=4, n_jobs=2)
+    assert len(saved) == 2
+    np.testing.assert_allclose(in_memory["scores"], serial["scores"])
+
+
+def test_train_incremental_streams_chunks_into_state(housing_data_sample, tmp_path):
+    csv_path = tmp_path / "housing.csv"
+    housing_data_sample.to_csv(csv_path, index=False)
+
+    # One chunk holding every row with a 0.33 holdout is the data_split() workflow
+    model, score = train_incremental(csv_path, tmp_path / "split.npz", chunksize=100,
+                                     holdout=0.33)
+    X_train, X_test, y_train, y_test = data_split(*load_dataset(csv_path))
+    reference = train_model(X_train, y_train)
+    np.testing.assert_allclose(model.predict(X_test), reference.predict(X_test), rtol=1e-6)
+    assert score == pytest.approx(eval_model(X_test, y_test, reference))
+
+    # Without a holdout every row of every chunk is kept, like a full refit
+    state_path = tmp_path / "state.npz"
+    model, score = train_incremental(csv_path, state_path, chunksize=4)
+    assert score is None
+    X, y = load_dataset(csv_path)
+    assert model.n_samples_ == len(X)
+    np.testing.assert_allclose(model.predict(X), train_model(X, y).predict(X), rtol=1e-6)
+
+
+def test_train_incremental_applies_each_file_once(housing_data_sample, tmp_path):
+    first, second = tmp_path / "first.csv", tmp_path / "second.csv"
+    housing_data_sample.iloc[:6].to_csv(first, index=False)
+    housing_data_sample.iloc[6:].to_csv(second, index=False)
+    state_path = tmp_path / "state.npz"
+
+    train_incremental(first, state_path, chunksize=4)
+    with pytest.raises(SourceAlreadyApplied):
+        train_incremental(first, state_path, chunksize=4)
+    assert IncrementalLinearRegression.load(state_path).n_samples_ == 6
+
+    model, _ = train_incremental(second, state_path, chunksize=4)
+    reloaded = IncrementalLinearRegression.load(state_path)
+    assert model.n_samples_ == reloaded.n_samples_ == 10
+    assert reloaded.sources_ == [file_digest(first), file_digest(second)]